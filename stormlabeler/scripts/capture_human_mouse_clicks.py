@@ -6,6 +6,7 @@ cannot run it on a supercomputer without X-forwarding or whatever it's called.
 
 import os.path
 import argparse
+import operator
 import numpy
 from stormlabeler.utils import human_polygons
 from stormlabeler.scripts import capture_human_polygons
@@ -17,6 +18,12 @@ NUM_PANEL_ROWS_ARG_NAME = 'num_panel_rows'
 NUM_PANEL_COLUMNS_ARG_NAME = 'num_panel_columns'
 OUTPUT_DIR_ARG_NAME = 'output_dir_name'
 
+# Argument names double as keyword arguments to `_run`.
+INPUT_ARG_NAMES = (
+    IMAGE_PATH_ARG_NAME, NUM_GRID_ROWS_ARG_NAME, NUM_GRID_COLUMNS_ARG_NAME,
+    NUM_PANEL_ROWS_ARG_NAME, NUM_PANEL_COLUMNS_ARG_NAME, OUTPUT_DIR_ARG_NAME
+)
+
 IMAGE_PATH_HELP_STRING = (
     'Path to input file or directory.  This script will allow you to record '
     'mouse clicks over each image.  Each file name must be in the format {0:s}.'
@@ -42,30 +49,42 @@ OUTPUT_DIR_HELP_STRING = (
     'Name of output directory.  Files will be saved here by '
     '`human_polygons.write_polygons`.')
 
-INPUT_ARG_PARSER = argparse.ArgumentParser()
-INPUT_ARG_PARSER.add_argument(
-    '-i', '--' + IMAGE_PATH_ARG_NAME, type=str, required=True,
-    help=IMAGE_PATH_HELP_STRING)
 
-INPUT_ARG_PARSER.add_argument(
-    '-ngridrows', '--' + NUM_GRID_ROWS_ARG_NAME, type=int, required=False,
-    default=32, help=NUM_GRID_ROWS_HELP_STRING)
+def _build_parser():
+    """Creates parser for command-line arguments.
+
+    This is done on demand, rather than at import time, so that other modules
+    can import this one without building the parser.
+
+    :return: arg_parser_object: Instance of `argparse.ArgumentParser`.
+    """
+
+    arg_parser_object = argparse.ArgumentParser()
+    arg_parser_object.add_argument(
+        '-i', '--' + IMAGE_PATH_ARG_NAME, type=str, required=True,
+        help=IMAGE_PATH_HELP_STRING)
 
-INPUT_ARG_PARSER.add_argument(
-    '-ngridcols', '--' + NUM_GRID_COLUMNS_ARG_NAME, type=int, required=False,
-    default=32, help=NUM_GRID_COLUMNS_HELP_STRING)
+    arg_parser_object.add_argument(
+        '-ngridrows', '--' + NUM_GRID_ROWS_ARG_NAME, type=int, required=False,
+        default=32, help=NUM_GRID_ROWS_HELP_STRING)
 
-INPUT_ARG_PARSER.add_argument(
-    '-npanelrows', '--' + NUM_PANEL_ROWS_ARG_NAME, type=int, required=False,
-    default=1, help=NUM_PANEL_ROWS_HELP_STRING)
+    arg_parser_object.add_argument(
+        '-ngridcols', '--' + NUM_GRID_COLUMNS_ARG_NAME, type=int,
+        required=False, default=32, help=NUM_GRID_COLUMNS_HELP_STRING)
 
-INPUT_ARG_PARSER.add_argument(
-    '-npanelcols', '--' + NUM_PANEL_COLUMNS_ARG_NAME, type=int, required=False,
-    default=2, help=NUM_PANEL_COLUMNS_HELP_STRING)
+    arg_parser_object.add_argument(
+        '-npanelrows', '--' + NUM_PANEL_ROWS_ARG_NAME, type=int, required=False,
+        default=1, help=NUM_PANEL_ROWS_HELP_STRING)
 
-INPUT_ARG_PARSER.add_argument(
-    '-o', '--' + OUTPUT_DIR_ARG_NAME, type=str, required=True,
-    help=OUTPUT_DIR_HELP_STRING)
+    arg_parser_object.add_argument(
+        '-npanelcols', '--' + NUM_PANEL_COLUMNS_ARG_NAME, type=int,
+        required=False, default=2, help=NUM_PANEL_COLUMNS_HELP_STRING)
+
+    arg_parser_object.add_argument(
+        '-o', '--' + OUTPUT_DIR_ARG_NAME, type=str, required=True,
+        help=OUTPUT_DIR_HELP_STRING)
+
+    return arg_parser_object
 
 
 def _capture_clicks_one_image(
@@ -158,13 +177,8 @@ def _run(image_dir_or_file_name, num_grid_rows, num_grid_columns,
 
 
 if __name__ == '__main__':
-    INPUT_ARG_OBJECT = INPUT_ARG_PARSER.parse_args()
-
-    _run(
-        image_dir_or_file_name=getattr(INPUT_ARG_OBJECT, IMAGE_PATH_ARG_NAME),
-        num_grid_rows=getattr(INPUT_ARG_OBJECT, NUM_GRID_ROWS_ARG_NAME),
-        num_grid_columns=getattr(INPUT_ARG_OBJECT, NUM_GRID_COLUMNS_ARG_NAME),
-        num_panel_rows=getattr(INPUT_ARG_OBJECT, NUM_PANEL_ROWS_ARG_NAME),
-        num_panel_columns=getattr(INPUT_ARG_OBJECT, NUM_PANEL_COLUMNS_ARG_NAME),
-        output_dir_name=getattr(INPUT_ARG_OBJECT, OUTPUT_DIR_ARG_NAME)
-    )
+    INPUT_ARG_OBJECT = _build_parser().parse_args()
+
+    _run(**dict(zip(
+        INPUT_ARG_NAMES, operator.attrgetter(*INPUT_ARG_NAMES)(INPUT_ARG_OBJECT)
+    )))
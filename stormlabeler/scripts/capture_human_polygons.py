@@ -8,6 +8,8 @@ import glob
 import os.path
 import warnings
 import argparse
+import operator
+from concurrent.futures import ThreadPoolExecutor
 from stormlabeler.utils import human_polygons
 from stormlabeler.utils import error_checking
 
@@ -23,6 +25,13 @@ NUM_PANEL_ROWS_ARG_NAME = 'num_panel_rows'
 NUM_PANEL_COLUMNS_ARG_NAME = 'num_panel_columns'
 OUTPUT_DIR_ARG_NAME = 'output_dir_name'
 
+# Argument names double as keyword arguments to `_run`.
+INPUT_ARG_NAMES = (
+    IMAGE_PATH_ARG_NAME, POS_NEG_ARG_NAME, NUM_GRID_ROWS_ARG_NAME,
+    NUM_GRID_COLUMNS_ARG_NAME, NUM_PANEL_ROWS_ARG_NAME,
+    NUM_PANEL_COLUMNS_ARG_NAME, OUTPUT_DIR_ARG_NAME
+)
+
 IMAGE_PATH_HELP_STRING = (
     'Path to input file or directory.  This script will allow you to draw '
     'polygons over each image.  Each file name must be in the format {0:s}.'
@@ -53,34 +62,46 @@ OUTPUT_DIR_HELP_STRING = (
     'Name of output directory.  Files will be saved here by '
     '`human_polygons.write_polygons`.')
 
-INPUT_ARG_PARSER = argparse.ArgumentParser()
-INPUT_ARG_PARSER.add_argument(
-    '-i', '--' + IMAGE_PATH_ARG_NAME, type=str, required=True,
-    help=IMAGE_PATH_HELP_STRING)
 
-INPUT_ARG_PARSER.add_argument(
-    '-posandneg', '--' + POS_NEG_ARG_NAME, type=int, required=False, default=0,
-    help=POS_NEG_HELP_STRING)
+def _build_parser():
+    """Creates parser for command-line arguments.
+
+    This is done on demand, rather than at import time, so that other modules
+    can import this one without building the parser.
+
+    :return: arg_parser_object: Instance of `argparse.ArgumentParser`.
+    """
+
+    arg_parser_object = argparse.ArgumentParser()
+    arg_parser_object.add_argument(
+        '-i', '--' + IMAGE_PATH_ARG_NAME, type=str, required=True,
+        help=IMAGE_PATH_HELP_STRING)
+
+    arg_parser_object.add_argument(
+        '-posandneg', '--' + POS_NEG_ARG_NAME, type=int, required=False,
+        default=0, help=POS_NEG_HELP_STRING)
 
-INPUT_ARG_PARSER.add_argument(
-    '-ngridrows', '--' + NUM_GRID_ROWS_ARG_NAME, type=int, required=False,
-    default=32, help=NUM_GRID_ROWS_HELP_STRING)
+    arg_parser_object.add_argument(
+        '-ngridrows', '--' + NUM_GRID_ROWS_ARG_NAME, type=int, required=False,
+        default=32, help=NUM_GRID_ROWS_HELP_STRING)
 
-INPUT_ARG_PARSER.add_argument(
-    '-ngridcols', '--' + NUM_GRID_COLUMNS_ARG_NAME, type=int, required=False,
-    default=32, help=NUM_GRID_COLUMNS_HELP_STRING)
+    arg_parser_object.add_argument(
+        '-ngridcols', '--' + NUM_GRID_COLUMNS_ARG_NAME, type=int,
+        required=False, default=32, help=NUM_GRID_COLUMNS_HELP_STRING)
 
-INPUT_ARG_PARSER.add_argument(
-    '-npanelrows', '--' + NUM_PANEL_ROWS_ARG_NAME, type=int, required=False,
-    default=1, help=NUM_PANEL_ROWS_HELP_STRING)
+    arg_parser_object.add_argument(
+        '-npanelrows', '--' + NUM_PANEL_ROWS_ARG_NAME, type=int, required=False,
+        default=1, help=NUM_PANEL_ROWS_HELP_STRING)
 
-INPUT_ARG_PARSER.add_argument(
-    '-npanelcols', '--' + NUM_PANEL_COLUMNS_ARG_NAME, type=int, required=False,
-    default=2, help=NUM_PANEL_COLUMNS_HELP_STRING)
+    arg_parser_object.add_argument(
+        '-npanelcols', '--' + NUM_PANEL_COLUMNS_ARG_NAME, type=int,
+        required=False, default=2, help=NUM_PANEL_COLUMNS_HELP_STRING)
 
-INPUT_ARG_PARSER.add_argument(
-    '-o', '--' + OUTPUT_DIR_ARG_NAME, type=str, required=True,
-    help=OUTPUT_DIR_HELP_STRING)
+    arg_parser_object.add_argument(
+        '-o', '--' + OUTPUT_DIR_ARG_NAME, type=str, required=True,
+        help=OUTPUT_DIR_HELP_STRING)
+
+    return arg_parser_object
 
 
 def _capture_polygons_one_image(
@@ -88,6 +109,11 @@ def _capture_polygons_one_image(
         num_panel_rows, num_panel_columns, output_file_name):
     """Captures human polygons for one image.
 
+    Positive polygons are converted to grid coordinates right away, so that
+    invalid polygons are reported before the human draws negative polygons.
+    They are then rasterized in a background thread while the human draws.
+    Drawing must stay in the main thread, which owns the figure window.
+
     :param image_file_name: Path to image file.
     :param positive_and_negative: See documentation at top of file.
     :param num_grid_rows: Same.
@@ -105,10 +131,11 @@ def _capture_polygons_one_image(
         'Outline regions that most support tornado production in the next hour.'
         '  LEFT-CLICK for new vertex; RIGHT-CLICK to close polygon.')
 
+    image_matrix = human_polygons.read_image(image_file_name)
+
     positive_objects_pixel_coords, num_pixel_rows, num_pixel_columns = (
-        human_polygons.capture_polygons(
-            image_file_name=image_file_name,
-            instruction_string=instruction_string)
+        human_polygons.capture_polygons_from_array(
+            image_matrix=image_matrix, instruction_string=instruction_string)
     )
 
     (positive_objects_grid_coords, positive_panel_row_by_polygon,
@@ -119,43 +146,50 @@ def _capture_polygons_one_image(
         num_pixel_rows=num_pixel_rows, num_pixel_columns=num_pixel_columns,
         num_panel_rows=num_panel_rows, num_panel_columns=num_panel_columns)
 
-    positive_mask_matrix = human_polygons.polygons_to_mask(
-        polygon_objects_grid_coords=positive_objects_grid_coords,
-        num_grid_rows=num_grid_rows, num_grid_columns=num_grid_columns,
-        num_panel_rows=num_panel_rows, num_panel_columns=num_panel_columns,
-        panel_row_by_polygon=positive_panel_row_by_polygon,
-        panel_column_by_polygon=positive_panel_column_by_polygon)
-
-    if positive_and_negative:
-        instruction_string = (
-            'Outline NEGATIVE regions of interest.  Left-click for new vertex, '
-            'right-click to close polygon.')
-
-        negative_objects_pixel_coords, num_pixel_rows, num_pixel_columns = (
-            human_polygons.capture_polygons(
-                image_file_name=image_file_name,
-                instruction_string=instruction_string)
-        )
-
-        (negative_objects_grid_coords, negative_panel_row_by_polygon,
-         negative_panel_column_by_polygon
-        ) = human_polygons.polygons_from_pixel_to_grid_coords(
-            polygon_objects_pixel_coords=negative_objects_pixel_coords,
-            num_grid_rows=num_grid_rows, num_grid_columns=num_grid_columns,
-            num_pixel_rows=num_pixel_rows, num_pixel_columns=num_pixel_columns,
-            num_panel_rows=num_panel_rows, num_panel_columns=num_panel_columns)
-
-        negative_mask_matrix = human_polygons.polygons_to_mask(
-            polygon_objects_grid_coords=negative_objects_grid_coords,
+    with ThreadPoolExecutor(max_workers=1) as executor_object:
+        positive_future_object = executor_object.submit(
+            human_polygons.polygons_to_mask,
+            polygon_objects_grid_coords=positive_objects_grid_coords,
             num_grid_rows=num_grid_rows, num_grid_columns=num_grid_columns,
             num_panel_rows=num_panel_rows, num_panel_columns=num_panel_columns,
-            panel_row_by_polygon=negative_panel_row_by_polygon,
-            panel_column_by_polygon=negative_panel_column_by_polygon)
-    else:
-        negative_objects_grid_coords = None
-        negative_panel_row_by_polygon = None
-        negative_panel_column_by_polygon = None
-        negative_mask_matrix = None
+            panel_row_by_polygon=positive_panel_row_by_polygon,
+            panel_column_by_polygon=positive_panel_column_by_polygon)
+
+        if positive_and_negative:
+            instruction_string = (
+                'Outline NEGATIVE regions of interest.  Left-click for new '
+                'vertex, right-click to close polygon.')
+
+            negative_objects_pixel_coords = (
+                human_polygons.capture_polygons_from_array(
+                    image_matrix=image_matrix,
+                    instruction_string=instruction_string)
+            )[0]
+
+            (negative_objects_grid_coords, negative_panel_row_by_polygon,
+             negative_panel_column_by_polygon
+            ) = human_polygons.polygons_from_pixel_to_grid_coords(
+                polygon_objects_pixel_coords=negative_objects_pixel_coords,
+                num_grid_rows=num_grid_rows, num_grid_columns=num_grid_columns,
+                num_pixel_rows=num_pixel_rows,
+                num_pixel_columns=num_pixel_columns,
+                num_panel_rows=num_panel_rows,
+                num_panel_columns=num_panel_columns)
+
+            negative_mask_matrix = human_polygons.polygons_to_mask(
+                polygon_objects_grid_coords=negative_objects_grid_coords,
+                num_grid_rows=num_grid_rows, num_grid_columns=num_grid_columns,
+                num_panel_rows=num_panel_rows,
+                num_panel_columns=num_panel_columns,
+                panel_row_by_polygon=negative_panel_row_by_polygon,
+                panel_column_by_polygon=negative_panel_column_by_polygon)
+        else:
+            negative_objects_grid_coords = None
+            negative_panel_row_by_polygon = None
+            negative_panel_column_by_polygon = None
+            negative_mask_matrix = None
+
+        positive_mask_matrix = positive_future_object.result()
 
     print('Writing polygons and masks to: "{0:s}"...'.format(output_file_name))
 
@@ -297,16 +331,11 @@ def get_image_files(image_dir_or_file_name):
 
 
 if __name__ == '__main__':
-    INPUT_ARG_OBJECT = INPUT_ARG_PARSER.parse_args()
-
-    _run(
-        image_dir_or_file_name=getattr(INPUT_ARG_OBJECT, IMAGE_PATH_ARG_NAME),
-        positive_and_negative=bool(getattr(
-            INPUT_ARG_OBJECT, POS_NEG_ARG_NAME
-        )),
-        num_grid_rows=getattr(INPUT_ARG_OBJECT, NUM_GRID_ROWS_ARG_NAME),
-        num_grid_columns=getattr(INPUT_ARG_OBJECT, NUM_GRID_COLUMNS_ARG_NAME),
-        num_panel_rows=getattr(INPUT_ARG_OBJECT, NUM_PANEL_ROWS_ARG_NAME),
-        num_panel_columns=getattr(INPUT_ARG_OBJECT, NUM_PANEL_COLUMNS_ARG_NAME),
-        output_dir_name=getattr(INPUT_ARG_OBJECT, OUTPUT_DIR_ARG_NAME)
-    )
+    INPUT_ARG_OBJECT = _build_parser().parse_args()
+
+    INPUT_ARG_DICT = dict(zip(
+        INPUT_ARG_NAMES, operator.attrgetter(*INPUT_ARG_NAMES)(INPUT_ARG_OBJECT)
+    ))
+    INPUT_ARG_DICT[POS_NEG_ARG_NAME] = bool(INPUT_ARG_DICT[POS_NEG_ARG_NAME])
+
+    _run(**INPUT_ARG_DICT)
@@ -1,14 +1,18 @@
 """Handles polygons drawn interactively by a human."""
 
+import os
+import tempfile
 import warnings
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 import numpy
+import matplotlib.image
 import matplotlib.pyplot as pyplot
 import netCDF4
 from PIL import Image
 import shapely.geometry
 from roipoly import MultiRoi
 from stormlabeler.utils import polygons
-from stormlabeler.utils import general_utils
 from stormlabeler.utils import file_system_utils
 from stormlabeler.utils import error_checking
 
@@ -25,7 +29,15 @@ MARKER_EDGE_WIDTH = 1
 MARKER_COLOUR = 'k'
 
 SENTINEL_VALUE = -9999.
+SCANLINE_TOLERANCE = 1e-6
+MASK_COMPRESSION_LEVEL = 4
+MIN_CHUNK_CACHE_SIZE_BYTES = 16 * 1024 * 1024
+MIN_VALUES_PER_INDEXED_READ = 100000
 DUMMY_STORM_ID_STRING = 'pmm'
+CACHE_FILE_SUFFIX = '.cache.npz'
+
+SOURCE_FILE_SIZE_KEY = 'source_file_size_bytes'
+SOURCE_MODIFICATION_TIME_KEY = 'source_modification_time_ns'
 
 STORM_ID_KEY = 'full_storm_id_string'
 STORM_TIME_KEY = 'storm_time_unix_sec'
@@ -35,12 +47,24 @@ POSITIVE_PANEL_ROW_BY_VERTEX_KEY = 'positive_panel_row_by_vertex'
 POSITIVE_PANEL_COLUMN_BY_VERTEX_KEY = 'positive_panel_column_by_vertex'
 NEGATIVE_VERTEX_ROWS_KEY = 'negative_vertex_rows'
 NEGATIVE_VERTEX_COLUMNS_KEY = 'negative_vertex_columns'
+POSITIVE_VERTICES_KEY = 'positive_vertex_coords'
+NEGATIVE_VERTICES_KEY = 'negative_vertex_coords'
 NEGATIVE_PANEL_ROW_BY_VERTEX_KEY = 'negative_panel_row_by_vertex'
 NEGATIVE_PANEL_COLUMN_BY_VERTEX_KEY = 'negative_panel_column_by_vertex'
 POSITIVE_MASK_MATRIX_KEY = 'positive_mask_matrix'
 POSITIVE_POLYGON_OBJECTS_KEY = 'positive_objects_grid_coords'
 NEGATIVE_MASK_MATRIX_KEY = 'negative_mask_matrix'
 NEGATIVE_POLYGON_OBJECTS_KEY = 'negative_objects_grid_coords'
+PACKED_MASK_MATRIX_KEY = 'packed_mask_matrix'
+POSITIVE_FIRST_VERTEX_INDICES_KEY = 'positive_poly_to_first_vertex_indices'
+NEGATIVE_FIRST_VERTEX_INDICES_KEY = 'negative_poly_to_first_vertex_indices'
+POSITIVE_POLYGON_COORDS_KEY = 'positive_polygon_coord_matrix'
+POSITIVE_POLYGON_OFFSETS_KEY = 'positive_polygon_vertex_offsets'
+NEGATIVE_POLYGON_COORDS_KEY = 'negative_polygon_coord_matrix'
+NEGATIVE_POLYGON_OFFSETS_KEY = 'negative_polygon_vertex_offsets'
+
+POSITIVE_MASK_FLAG = 1
+NEGATIVE_MASK_FLAG = 2
 
 GRID_ROW_DIMENSION_KEY = 'grid_row'
 GRID_COLUMN_DIMENSION_KEY = 'grid_column'
@@ -48,6 +72,7 @@ PANEL_ROW_DIMENSION_KEY = 'panel_row'
 PANEL_COLUMN_DIMENSION_KEY = 'panel_column'
 POSITIVE_VERTEX_DIM_KEY = 'positive_polygon_vertex'
 NEGATIVE_VERTEX_DIM_KEY = 'negative_polygon_vertex'
+VERTEX_COORD_DIM_KEY = 'vertex_coord'
 
 POSITIVE_PANEL_ROW_BY_POLY_KEY = 'positive_panel_row_by_polygon'
 POSITIVE_PANEL_COLUMN_BY_POLY_KEY = 'positive_panel_column_by_polygon'
@@ -79,14 +104,12 @@ def _check_polygons(
     error_checking.assert_is_integer(num_panel_columns)
     error_checking.assert_is_greater(num_panel_columns, 0)
 
+    error_checking.assert_is_list(polygon_objects_grid_coords)
+
     num_polygons = len(polygon_objects_grid_coords)
     if num_polygons == 0:
         return
 
-    error_checking.assert_is_numpy_array(
-        numpy.array(polygon_objects_grid_coords, dtype=object), num_dimensions=1
-    )
-
     these_expected_dim = numpy.array([num_polygons], dtype=int)
 
     error_checking.assert_is_integer_numpy_array(panel_row_by_polygon)
@@ -104,6 +127,97 @@ def _check_polygons(
         panel_column_by_polygon, num_panel_columns)
 
 
+def _polygons_to_vertex_arrays(polygon_objects):
+    """Converts list of polygons to flat vertex arrays.
+
+    The vertices of all polygons are stored contiguously, so that they can be
+    processed with vectorized numpy operations, rather than one polygon at a
+    time.  Only polygon exteriors are used.
+
+    V = total number of vertices
+    P = number of polygons
+
+    :param polygon_objects: length-P list of polygons (instances of
+        `shapely.geometry.Polygon`).
+    :return: vertex_x_coords: length-V numpy array of x-coordinates.
+    :return: vertex_y_coords: length-V numpy array of y-coordinates.
+    :return: polygon_to_first_vertex_indices: length-P numpy array of indices.
+        If polygon_to_first_vertex_indices[k] = i, the first vertex in the
+        [k]th polygon is the [i]th vertex.
+    """
+
+    num_polygons = len(polygon_objects)
+
+    # Shapely 2 can extract all coordinates with one call to compiled code.
+    if hasattr(shapely, 'get_coordinates'):
+        vertex_coord_matrix, polygon_index_by_vertex = shapely.get_coordinates(
+            shapely.get_exterior_ring(polygon_objects), return_index=True
+        )
+        num_vertices_by_polygon = numpy.bincount(
+            polygon_index_by_vertex, minlength=num_polygons
+        )
+    else:
+        coord_matrix_by_polygon = [
+            numpy.asarray(p.exterior.coords)[:, :2] for p in polygon_objects
+        ]
+        num_vertices_by_polygon = numpy.array(
+            [m.shape[0] for m in coord_matrix_by_polygon], dtype=int
+        )
+        vertex_coord_matrix = numpy.concatenate(
+            [numpy.full((0, 2), 0.)] + coord_matrix_by_polygon, axis=0
+        )
+
+    polygon_to_first_vertex_indices = (
+        numpy.cumsum(num_vertices_by_polygon) - num_vertices_by_polygon
+    )
+
+    return (
+        vertex_coord_matrix[:, 0], vertex_coord_matrix[:, 1],
+        polygon_to_first_vertex_indices
+    )
+
+
+def _vertex_arrays_to_polygons(
+        vertex_x_coords, vertex_y_coords, polygon_to_first_vertex_indices):
+    """This method is the inverse of `_polygons_to_vertex_arrays`.
+
+    :param vertex_x_coords: See doc for `_polygons_to_vertex_arrays`.
+    :param vertex_y_coords: Same.
+    :param polygon_to_first_vertex_indices: Same.
+    :return: polygon_objects: Same.
+    """
+
+    num_polygons = len(polygon_to_first_vertex_indices)
+    if num_polygons == 0:
+        return []
+
+    # Shapely 2 can create all polygons with one call to compiled code.
+    if hasattr(shapely, 'polygons'):
+        polygon_index_by_vertex = numpy.repeat(
+            numpy.linspace(0, num_polygons - 1, num=num_polygons, dtype=int),
+            numpy.diff(numpy.concatenate((
+                polygon_to_first_vertex_indices,
+                numpy.array([len(vertex_x_coords)], dtype=int)
+            )))
+        )
+
+        ring_objects = shapely.linearrings(
+            numpy.transpose(numpy.vstack((vertex_x_coords, vertex_y_coords))),
+            indices=polygon_index_by_vertex
+        )
+
+        return list(shapely.polygons(ring_objects))
+
+    return [
+        polygons.vertex_arrays_to_polygon(
+            x_coordinates=these_x_coords, y_coordinates=these_y_coords)
+        for these_x_coords, these_y_coords in zip(
+            numpy.split(vertex_x_coords, polygon_to_first_vertex_indices[1:]),
+            numpy.split(vertex_y_coords, polygon_to_first_vertex_indices[1:])
+        )
+    ]
+
+
 def _polygon_list_to_vertex_list(polygon_objects_grid_coords):
     """Converts list of polygons to list of vertices.
 
@@ -121,89 +235,699 @@ def _polygon_list_to_vertex_list(polygon_objects_grid_coords):
     error_checking.assert_is_list(polygon_objects_grid_coords)
     num_polygons = len(polygon_objects_grid_coords)
 
-    if num_polygons > 0:
-        error_checking.assert_is_numpy_array(
-            numpy.array(polygon_objects_grid_coords, dtype=object),
-            num_dimensions=1
-        )
-
-    vertex_rows = []
-    vertex_columns = []
-    vertex_to_polygon_indices = []
-
-    for i in range(num_polygons):
-        this_num_vertices = len(polygon_objects_grid_coords[i].exterior.xy[1])
-
-        vertex_rows += polygon_objects_grid_coords[i].exterior.xy[1]
-        vertex_columns += polygon_objects_grid_coords[i].exterior.xy[0]
-        vertex_to_polygon_indices += [i] * this_num_vertices
+    vertex_columns, vertex_rows, polygon_to_first_vertex_indices = (
+        _polygons_to_vertex_arrays(polygon_objects_grid_coords)
+    )
 
-        if i == num_polygons - 1:
-            continue
+    polygon_index_by_vertex = numpy.repeat(
+        numpy.linspace(0, num_polygons - 1, num=num_polygons, dtype=int),
+        numpy.diff(numpy.concatenate((
+            polygon_to_first_vertex_indices,
+            numpy.array([len(vertex_rows)], dtype=int)
+        )))
+    )
 
-        vertex_rows += [numpy.nan]
-        vertex_columns += [numpy.nan]
-        vertex_to_polygon_indices += [-1]
+    # Consecutive polygons are separated by one NaN, with polygon index -1.
+    separator_indices = polygon_to_first_vertex_indices[1:]
 
     return (
-        numpy.array(vertex_rows), numpy.array(vertex_columns),
-        numpy.array(vertex_to_polygon_indices, dtype=int)
+        numpy.insert(vertex_rows, separator_indices, numpy.nan),
+        numpy.insert(vertex_columns, separator_indices, numpy.nan),
+        numpy.insert(polygon_index_by_vertex, separator_indices, -1)
     )
 
 
-def _vertex_list_to_polygon_list(vertex_rows, vertex_columns):
-    """This method is the inverse of `_polygon_list_to_vertex_list`.
+def _find_polygon_starts(vertex_rows, vertex_columns):
+    """Finds first vertex of each polygon in vertex list.
+
+    The vertex list is scanned once for NaN's, with vectorized numpy
+    operations, and the same NaN flags are used to find polygon starts and to
+    remove separators.
 
+    V = total number of vertices, including NaN separators
     P = number of polygons
 
     :param vertex_rows: See doc for `_polygon_list_to_vertex_list`.
     :param vertex_columns: Same.
-    :return: polygon_objects_grid_coords: Same.
     :return: polygon_to_first_vertex_indices: length-P numpy array of indices.
         If polygon_to_first_vertex_indices[j] = i, the first vertex in the
         [j]th polygon is the [i]th vertex in the input arrays.
+    :return: real_flags: length-V numpy array of Boolean flags, indicating
+        which vertices are real (not NaN separators).
     :raises: ValueError: if row and column lists have NaN's at different
         locations.
     """
 
-    if len(vertex_rows) == 0:
-        return [], numpy.array([], dtype=int)
+    nan_row_flags = numpy.isnan(vertex_rows)
+    nan_column_flags = numpy.isnan(vertex_columns)
 
-    nan_row_indices = numpy.where(numpy.isnan(vertex_rows))[0]
-    nan_column_indices = numpy.where(numpy.isnan(vertex_columns))[0]
-
-    if not numpy.array_equal(nan_row_indices, nan_column_indices):
+    if not numpy.array_equal(nan_row_flags, nan_column_flags):
         error_string = (
             'Row ({0:s}) and column ({1:s}) lists have NaN''s at different '
             'locations.'
-        ).format(str(nan_row_indices), str(nan_column_indices))
+        ).format(
+            str(numpy.flatnonzero(nan_row_flags)),
+            str(numpy.flatnonzero(nan_column_flags))
+        )
 
         raise ValueError(error_string)
 
-    polygon_to_first_vertex_indices = numpy.concatenate((
-        numpy.array([0], dtype=int),
-        nan_row_indices + 1
+    # There is one more polygon than NaN separator.  The output array is
+    # allocated once, with its final size, and filled in place.
+    polygon_to_first_vertex_indices = numpy.empty(
+        numpy.count_nonzero(nan_row_flags) + 1, dtype=int
+    )
+    polygon_to_first_vertex_indices[0] = 0
+    numpy.add(
+        numpy.flatnonzero(nan_row_flags), 1,
+        out=polygon_to_first_vertex_indices[1:]
+    )
+
+    return polygon_to_first_vertex_indices, numpy.invert(nan_row_flags)
+
+
+def _read_netcdf_variable(dataset_object, variable_name, dtype, indices=None):
+    """Reads one variable from NetCDF file.
+
+    Masking and scaling are turned off, so that netCDF4 returns the raw data as
+    a plain numpy array (rather than a masked array) without checking for fill
+    values or scale attributes.  None of the variables written by this module
+    use fill values or scaling.  The array is copied only if it must be cast to
+    the given type.
+
+    For chunked variables, the chunk cache is made large enough to hold at
+    least one chunk (and no smaller than `MIN_CHUNK_CACHE_SIZE_BYTES`), so that
+    chunks are not decompressed more than once.  The default cache size depends
+    on how the NetCDF library was built and can be as small as 1 MB.
+
+    :param dataset_object: Instance of `netCDF4.Dataset`.
+    :param variable_name: Name of variable.
+    :param dtype: Desired numpy data type.  If None, will keep the type stored
+        in the file.
+    :param indices: 1-D numpy array of increasing indices.  If specified, will
+        read only these elements of a 1-D variable.  If None, will read the
+        whole variable.
+    :return: data_matrix: numpy array with values of variable.
+    """
+
+    variable_object = dataset_object.variables[variable_name]
+    variable_object.set_auto_maskandscale(False)
+
+    chunk_sizes = (
+        variable_object.chunking()
+        if dataset_object.data_model.startswith('NETCDF4') else None
+    )
+
+    if chunk_sizes not in [None, 'contiguous']:
+        cache_size_bytes, num_cache_slots, cache_preemption = (
+            variable_object.get_var_chunk_cache()
+        )
+        min_cache_size_bytes = max([
+            MIN_CHUNK_CACHE_SIZE_BYTES,
+            int(numpy.prod(chunk_sizes)) * variable_object.dtype.itemsize
+        ])
+
+        if cache_size_bytes < min_cache_size_bytes:
+            variable_object.set_var_chunk_cache(
+                size=min_cache_size_bytes, nelems=num_cache_slots,
+                preemption=cache_preemption)
+
+    if indices is None:
+        return numpy.asarray(variable_object[:], dtype=dtype)
+
+    # netCDF4 reads indexed elements one at a time, which costs about as much
+    # per element as reading `MIN_VALUES_PER_INDEXED_READ` contiguous values.
+    # Thus, elements are read by index only if they are that sparse.
+    if len(indices) * MIN_VALUES_PER_INDEXED_READ < variable_object.size:
+        return numpy.asarray(variable_object[indices], dtype=dtype)
+
+    return numpy.asarray(
+        numpy.take(variable_object[:], indices), dtype=dtype
+    )
+
+
+def _read_vertices(dataset_object, positive):
+    """Reads polygon vertices from NetCDF file.
+
+    Newer files store the row and column of each vertex in one V-by-2 variable.
+    Older files store them in two length-V variables.
+
+    V = number of vertices
+
+    :param dataset_object: Instance of `netCDF4.Dataset`.
+    :param positive: Boolean flag.  If True, will read vertices of positive
+        regions of interest.  If False, will read vertices of negative regions.
+    :return: vertex_rows: length-V numpy array of row coordinates.  These are
+        kept in the type stored in the file (32-bit in newer files), rather
+        than being upcast to 64-bit.
+    :return: vertex_columns: Same but for column coordinates.
+    """
+
+    if positive:
+        vertices_key = POSITIVE_VERTICES_KEY
+        vertex_rows_key = POSITIVE_VERTEX_ROWS_KEY
+        vertex_columns_key = POSITIVE_VERTEX_COLUMNS_KEY
+    else:
+        vertices_key = NEGATIVE_VERTICES_KEY
+        vertex_rows_key = NEGATIVE_VERTEX_ROWS_KEY
+        vertex_columns_key = NEGATIVE_VERTEX_COLUMNS_KEY
+
+    if vertices_key in dataset_object.variables:
+        vertex_coord_matrix = _read_netcdf_variable(
+            dataset_object=dataset_object, variable_name=vertices_key,
+            dtype=None)
+
+        return vertex_coord_matrix[:, 0], vertex_coord_matrix[:, 1]
+
+    vertex_rows = _read_netcdf_variable(
+        dataset_object=dataset_object, variable_name=vertex_rows_key,
+        dtype=None)
+    vertex_columns = _read_netcdf_variable(
+        dataset_object=dataset_object, variable_name=vertex_columns_key,
+        dtype=None)
+
+    return vertex_rows, vertex_columns
+
+
+def _read_polygons_one_sign(dataset_object, positive):
+    """Reads polygons of one sign (positive or negative) from NetCDF file.
+
+    P = number of polygons
+
+    :param dataset_object: Instance of `netCDF4.Dataset`.
+    :param positive: Boolean flag.  If True, will read positive regions of
+        interest.  If False, will read negative regions.
+    :return: polygon_objects_grid_coords: length-P list of polygons (instances
+        of `shapely.geometry.Polygon`) in grid coordinates.
+    :return: panel_row_by_polygon: length-P numpy array of panel rows.
+    :return: panel_column_by_polygon: length-P numpy array of panel columns.
+    :return: polygon_coord_matrix: V-by-2 numpy array with vertices of all
+        polygons, without separators, where V is the total number of vertices.
+        The first column is grid row and the second is grid column.
+    :return: polygon_vertex_offsets: length-(P + 1) numpy array of indices into
+        rows of `polygon_coord_matrix`.  Vertices of the [k]th polygon are in
+        rows polygon_vertex_offsets[k]...(polygon_vertex_offsets[k + 1] - 1).
+    """
+
+    if positive:
+        panel_row_key = POSITIVE_PANEL_ROW_BY_VERTEX_KEY
+        panel_column_key = POSITIVE_PANEL_COLUMN_BY_VERTEX_KEY
+    else:
+        panel_row_key = NEGATIVE_PANEL_ROW_BY_VERTEX_KEY
+        panel_column_key = NEGATIVE_PANEL_COLUMN_BY_VERTEX_KEY
+
+    vertex_rows, vertex_columns = _read_vertices(
+        dataset_object=dataset_object, positive=positive)
+
+    # If there are no positive polygons, `write_polygons` stores one dummy
+    # vertex with a value below `SENTINEL_VALUE`.
+    if len(vertex_rows) == 0 or vertex_rows[0] <= SENTINEL_VALUE:
+        poly_to_first_vertex_indices = numpy.array([], dtype=int)
+        real_flags = numpy.full(len(vertex_rows), False, dtype=bool)
+    else:
+        poly_to_first_vertex_indices, real_flags = _find_polygon_starts(
+            vertex_rows=vertex_rows, vertex_columns=vertex_columns)
+
+    # Once NaN's are removed, the first vertex of the [k]th polygon moves back
+    # by k (the number of NaN's before it).
+    num_polygons = len(poly_to_first_vertex_indices)
+    polygon_coord_matrix = numpy.column_stack(
+        (vertex_rows[real_flags], vertex_columns[real_flags])
+    )
+
+    polygon_vertex_offsets = numpy.empty(num_polygons + 1, dtype=int)
+    polygon_vertex_offsets[:-1] = (
+        poly_to_first_vertex_indices -
+        numpy.linspace(0, num_polygons - 1, num=num_polygons, dtype=int)
+    )
+    polygon_vertex_offsets[-1] = polygon_coord_matrix.shape[0]
+
+    del vertex_rows, vertex_columns, real_flags
+
+    polygon_objects_grid_coords = _vertex_arrays_to_polygons(
+        vertex_x_coords=polygon_coord_matrix[:, 1],
+        vertex_y_coords=polygon_coord_matrix[:, 0],
+        polygon_to_first_vertex_indices=polygon_vertex_offsets[:-1]
+    )
+
+    # Panel indices are stored for every vertex, but only the first vertex of
+    # each polygon is needed.  Values are read in the type stored in the file
+    # (usually int8; see `write_polygons`), so that per-vertex arrays are never
+    # upcast.  Only the much shorter per-polygon arrays are converted, into
+    # output arrays that are allocated once with the final type.
+    panel_row_by_polygon = numpy.empty(num_polygons, dtype=int)
+    panel_column_by_polygon = numpy.empty(num_polygons, dtype=int)
+
+    panel_row_by_polygon[:] = _read_netcdf_variable(
+        dataset_object=dataset_object, variable_name=panel_row_key,
+        dtype=None, indices=poly_to_first_vertex_indices)
+
+    panel_column_by_polygon[:] = _read_netcdf_variable(
+        dataset_object=dataset_object, variable_name=panel_column_key,
+        dtype=None, indices=poly_to_first_vertex_indices)
+
+    return (
+        polygon_objects_grid_coords, panel_row_by_polygon,
+        panel_column_by_polygon, polygon_coord_matrix, polygon_vertex_offsets
+    )
+
+
+def _pack_masks(positive_mask_matrix, negative_mask_matrix):
+    """Packs positive and negative masks into one array.
+
+    Each element of the packed array is a bit field, where the first bit
+    (`POSITIVE_MASK_FLAG`) is the positive mask and the second bit
+    (`NEGATIVE_MASK_FLAG`) is the negative mask.  Bit fields are used, rather
+    than one signed value per grid point, because positive and negative regions
+    of interest are drawn separately and may overlap.
+
+    :param positive_mask_matrix: numpy array of Boolean flags.
+    :param negative_mask_matrix: numpy array of Boolean flags, with same shape
+        as `positive_mask_matrix`.
+    :return: packed_mask_matrix: numpy array of integers (uint8), with same
+        shape as `positive_mask_matrix`.
+    """
+
+    # Boolean arrays are viewed as uint8 (0 or 1) without copying.
+    packed_mask_matrix = numpy.multiply(
+        positive_mask_matrix.view(numpy.uint8), POSITIVE_MASK_FLAG,
+        dtype=numpy.uint8
+    )
+    packed_mask_matrix += numpy.multiply(
+        negative_mask_matrix.view(numpy.uint8), NEGATIVE_MASK_FLAG,
+        dtype=numpy.uint8
+    )
+
+    return packed_mask_matrix
+
+
+def _unpack_masks(packed_mask_matrix):
+    """This method is the inverse of `_pack_masks`.
+
+    :param packed_mask_matrix: See doc for `_pack_masks`.
+    :return: positive_mask_matrix: Same.
+    :return: negative_mask_matrix: Same.
+    """
+
+    # Each flag is shifted down to 0 or 1 in place, so that the uint8 result
+    # can be viewed as Boolean without copying.
+    positive_mask_matrix = numpy.bitwise_and(
+        packed_mask_matrix, POSITIVE_MASK_FLAG, dtype=numpy.uint8
+    )
+    numpy.floor_divide(
+        positive_mask_matrix, POSITIVE_MASK_FLAG, out=positive_mask_matrix
+    )
+
+    negative_mask_matrix = numpy.bitwise_and(
+        packed_mask_matrix, NEGATIVE_MASK_FLAG, dtype=numpy.uint8
+    )
+    numpy.floor_divide(
+        negative_mask_matrix, NEGATIVE_MASK_FLAG, out=negative_mask_matrix
+    )
+
+    return positive_mask_matrix.view(bool), negative_mask_matrix.view(bool)
+
+
+def _write_polygon_cache(cache_file_name, polygon_dict, netcdf_file_stats):
+    """Writes polygons and masks to cache file.
+
+    The cache file is an uncompressed numpy archive, which can be read much
+    faster than the NetCDF file.  Polygons are stored as flat vertex arrays
+    (see `_read_polygons_one_sign`) and masks are packed (see `_pack_masks`).
+    The size and modification time of the NetCDF file are also stored, so that
+    `_read_polygon_cache` can tell whether the NetCDF file has changed since.
+    The file is written under a temporary name and then renamed, so that a
+    partly written cache file is never read.
+
+    :param cache_file_name: Path to output file.
+    :param polygon_dict: Dictionary created by `read_polygons`.
+    :param netcdf_file_stats: Result of `os.stat` for the NetCDF file, taken
+        before the file was read.
+    """
+
+    storm_id_string = polygon_dict[STORM_ID_KEY]
+    storm_time_unix_sec = polygon_dict[STORM_TIME_KEY]
+
+    cache_dict = {
+        STORM_ID_KEY: numpy.array(
+            DUMMY_STORM_ID_STRING if storm_id_string is None
+            else storm_id_string
+        ),
+        STORM_TIME_KEY: numpy.array(
+            -1 if storm_time_unix_sec is None else storm_time_unix_sec,
+            dtype=int
+        ),
+        PACKED_MASK_MATRIX_KEY: _pack_masks(
+            positive_mask_matrix=polygon_dict[POSITIVE_MASK_MATRIX_KEY],
+            negative_mask_matrix=polygon_dict[NEGATIVE_MASK_MATRIX_KEY]
+        ),
+        SOURCE_FILE_SIZE_KEY: numpy.array(
+            netcdf_file_stats.st_size, dtype=numpy.int64
+        ),
+        SOURCE_MODIFICATION_TIME_KEY: numpy.array(
+            netcdf_file_stats.st_mtime_ns, dtype=numpy.int64
+        )
+    }
+
+    for (this_coords_key, this_offsets_key, this_vertices_key,
+         this_first_vertex_key, this_panel_row_key, this_panel_column_key) in [
+             (POSITIVE_POLYGON_COORDS_KEY, POSITIVE_POLYGON_OFFSETS_KEY,
+              POSITIVE_VERTICES_KEY, POSITIVE_FIRST_VERTEX_INDICES_KEY,
+              POSITIVE_PANEL_ROW_BY_POLY_KEY,
+              POSITIVE_PANEL_COLUMN_BY_POLY_KEY),
+             (NEGATIVE_POLYGON_COORDS_KEY, NEGATIVE_POLYGON_OFFSETS_KEY,
+              NEGATIVE_VERTICES_KEY, NEGATIVE_FIRST_VERTEX_INDICES_KEY,
+              NEGATIVE_PANEL_ROW_BY_POLY_KEY,
+              NEGATIVE_PANEL_COLUMN_BY_POLY_KEY)
+    ]:
+        cache_dict[this_vertices_key] = polygon_dict[this_coords_key]
+        cache_dict[this_first_vertex_key] = (
+            polygon_dict[this_offsets_key][:-1]
+        )
+        cache_dict[this_panel_row_key] = polygon_dict[this_panel_row_key]
+        cache_dict[this_panel_column_key] = polygon_dict[this_panel_column_key]
+
+    # The temporary file has a unique name, so that two processes caching the
+    # same file at once do not write into each other's temporary file.
+    temp_file_handle, temp_file_name = tempfile.mkstemp(
+        suffix='.npz', dir=os.path.dirname(os.path.abspath(cache_file_name))
+    )
+
+    # `tempfile.mkstemp` creates the file readable only by the owner.  Give it
+    # the mode that `open` would have given it, so that other users of a
+    # shared directory can read the cache.
+    this_umask = os.umask(0)
+    os.umask(this_umask)
+
+    try:
+        with os.fdopen(temp_file_handle, 'wb') as cache_file_handle:
+            numpy.savez(cache_file_handle, **cache_dict)
+
+        os.chmod(temp_file_name, 0o666 & ~this_umask)
+        os.replace(temp_file_name, cache_file_name)
+    except BaseException:
+        os.remove(temp_file_name)
+        raise
+
+
+def _read_polygon_cache(cache_file_name, netcdf_file_stats):
+    """Reads polygons and masks from cache file.
+
+    :param cache_file_name: Path to input file (created by
+        `_write_polygon_cache`).
+    :param netcdf_file_stats: Result of `os.stat` for the NetCDF file.
+    :return: polygon_dict: See doc for `read_polygons`.  If the cache file was
+        written for another version of the NetCDF file (with a different size
+        or modification time), this is None.
+    """
+
+    polygon_dict = {}
+
+    with numpy.load(cache_file_name, allow_pickle=False) as cache_dict:
+        if (int(cache_dict[SOURCE_FILE_SIZE_KEY]) !=
+                netcdf_file_stats.st_size or
+                int(cache_dict[SOURCE_MODIFICATION_TIME_KEY]) !=
+                netcdf_file_stats.st_mtime_ns):
+            return None
+
+        polygon_dict[STORM_ID_KEY] = str(cache_dict[STORM_ID_KEY])
+        polygon_dict[STORM_TIME_KEY] = int(cache_dict[STORM_TIME_KEY])
+
+        (polygon_dict[POSITIVE_MASK_MATRIX_KEY],
+         polygon_dict[NEGATIVE_MASK_MATRIX_KEY]
+        ) = _unpack_masks(cache_dict[PACKED_MASK_MATRIX_KEY])
+
+        for (this_polygon_key, this_coords_key, this_offsets_key,
+             this_vertices_key, this_first_vertex_key, this_panel_row_key,
+             this_panel_column_key) in [
+                 (POSITIVE_POLYGON_OBJECTS_KEY, POSITIVE_POLYGON_COORDS_KEY,
+                  POSITIVE_POLYGON_OFFSETS_KEY, POSITIVE_VERTICES_KEY,
+                  POSITIVE_FIRST_VERTEX_INDICES_KEY,
+                  POSITIVE_PANEL_ROW_BY_POLY_KEY,
+                  POSITIVE_PANEL_COLUMN_BY_POLY_KEY),
+                 (NEGATIVE_POLYGON_OBJECTS_KEY, NEGATIVE_POLYGON_COORDS_KEY,
+                  NEGATIVE_POLYGON_OFFSETS_KEY, NEGATIVE_VERTICES_KEY,
+                  NEGATIVE_FIRST_VERTEX_INDICES_KEY,
+                  NEGATIVE_PANEL_ROW_BY_POLY_KEY,
+                  NEGATIVE_PANEL_COLUMN_BY_POLY_KEY)
+        ]:
+            this_coord_matrix = cache_dict[this_vertices_key]
+            these_first_vertex_indices = cache_dict[this_first_vertex_key]
+
+            polygon_dict[this_coords_key] = this_coord_matrix
+            polygon_dict[this_offsets_key] = numpy.concatenate((
+                these_first_vertex_indices,
+                numpy.array([this_coord_matrix.shape[0]], dtype=int)
+            ))
+
+            polygon_dict[this_polygon_key] = _vertex_arrays_to_polygons(
+                vertex_x_coords=this_coord_matrix[:, 1],
+                vertex_y_coords=this_coord_matrix[:, 0],
+                polygon_to_first_vertex_indices=these_first_vertex_indices
+            )
+
+            polygon_dict[this_panel_row_key] = cache_dict[this_panel_row_key]
+            polygon_dict[this_panel_column_key] = (
+                cache_dict[this_panel_column_key]
+            )
+
+    if polygon_dict[STORM_ID_KEY] == DUMMY_STORM_ID_STRING:
+        polygon_dict[STORM_ID_KEY] = None
+        polygon_dict[STORM_TIME_KEY] = None
+
+    return polygon_dict
+
+
+def _rasterize_polygons(
+        vertex_rows, vertex_columns, polygon_to_first_vertex_indices,
+        num_grid_rows, num_grid_columns):
+    """Finds grid points inside or touching any of several polygons.
+
+    This method uses scanlines.  For each grid row, it intersects the row with
+    all polygon edges and fills grid points between each pair of sorted
+    intersections from the same polygon.  Horizontal edges and vertices are
+    filled separately, so that all grid points on an edge are counted as inside
+    (like `polygons.point_in_or_on_polygon`).  All grid rows and all polygons
+    are handled at once, so there are no loops over rows, edges, or polygons.
+
+    V = total number of vertices in all polygons
+    P = number of polygons
+    M = number of rows in grid
+    N = number of columns in grid
+
+    :param vertex_rows: length-V numpy array with row coordinates of vertices.
+        Vertices of each polygon must be contiguous and in order around the
+        polygon (either clockwise or counterclockwise).
+    :param vertex_columns: length-V numpy array with column coordinates of
+        vertices.
+    :param polygon_to_first_vertex_indices: length-P numpy array of indices.
+        If polygon_to_first_vertex_indices[k] = i, the first vertex in the
+        [k]th polygon is the [i]th vertex.
+    :param num_grid_rows: M in the above discussion.
+    :param num_grid_columns: N in the above discussion.
+    :return: mask_matrix: M-by-N numpy array of Boolean flags.  If
+        mask_matrix[i, j] == True, grid point [i, j] is in/on at least one
+        polygon.
+    """
+
+    num_vertices = len(vertex_rows)
+    num_polygons = len(polygon_to_first_vertex_indices)
+
+    polygon_to_last_vertex_indices = numpy.concatenate((
+        polygon_to_first_vertex_indices[1:],
+        numpy.array([num_vertices], dtype=int)
+    )) - 1
+
+    # Edge k goes from vertex k - 1 to vertex k, except that the first edge in
+    # each polygon starts at the last vertex in the same polygon.
+    first_vertex_by_edge = numpy.linspace(
+        -1, num_vertices - 2, num=num_vertices, dtype=int
+    )
+    first_vertex_by_edge[polygon_to_first_vertex_indices] = (
+        polygon_to_last_vertex_indices
+    )
+
+    polygon_index_by_edge = numpy.repeat(
+        numpy.linspace(0, num_polygons - 1, num=num_polygons, dtype=int),
+        1 + polygon_to_last_vertex_indices - polygon_to_first_vertex_indices
+    )
+
+    first_row_by_edge = vertex_rows[first_vertex_by_edge]
+    first_column_by_edge = vertex_columns[first_vertex_by_edge]
+    second_row_by_edge = vertex_rows
+    second_column_by_edge = vertex_columns
+
+    mask_matrix = numpy.full(
+        (num_grid_rows, num_grid_columns), False, dtype=bool
+    )
+
+    # Grid points outside the bounding box of all polygons cannot be inside, so
+    # scanlines and spans are restricted to the bounding box.
+    first_box_row = max([
+        int(numpy.ceil(numpy.min(vertex_rows) - SCANLINE_TOLERANCE)), 0
+    ])
+    last_box_row = min([
+        int(numpy.floor(numpy.max(vertex_rows) + SCANLINE_TOLERANCE)),
+        num_grid_rows - 1
+    ])
+    first_box_column = max([
+        int(numpy.ceil(numpy.min(vertex_columns) - SCANLINE_TOLERANCE)), 0
+    ])
+    last_box_column = min([
+        int(numpy.floor(numpy.max(vertex_columns) + SCANLINE_TOLERANCE)),
+        num_grid_columns - 1
+    ])
+
+    if last_box_row < first_box_row or last_box_column < first_box_column:
+        return mask_matrix
+
+    num_box_rows = last_box_row - first_box_row + 1
+    num_box_columns = last_box_column - first_box_column + 1
+    box_rows = numpy.linspace(
+        first_box_row, last_box_row, num=num_box_rows, dtype=int
+    )
+
+    # Each scanline is one grid row.  An edge crosses row i if it spans the
+    # half-open interval [min row, max row), so that each vertex is counted
+    # once and each scanline crosses each polygon an even number of times.
+    grid_point_rows = box_rows.astype(float)[:, numpy.newaxis]
+
+    crossing_flag_matrix = numpy.logical_xor(
+        first_row_by_edge <= grid_point_rows,
+        second_row_by_edge <= grid_point_rows
+    )
+
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        crossing_column_matrix = first_column_by_edge + (
+            (grid_point_rows - first_row_by_edge) *
+            (second_column_by_edge - first_column_by_edge) /
+            (second_row_by_edge - first_row_by_edge)
+        )
+
+    # After sorting by polygon, then column, crossings in each row come in
+    # (start, end) pairs from the same polygon, followed by infinity for edges
+    # that do not cross the row.
+    crossing_column_matrix[numpy.invert(crossing_flag_matrix)] = numpy.inf
+    crossing_polygon_matrix = numpy.where(
+        crossing_flag_matrix, polygon_index_by_edge, num_polygons
+    )
+
+    if crossing_column_matrix.shape[1] % 2 == 1:
+        crossing_column_matrix = numpy.hstack((
+            crossing_column_matrix, numpy.full((num_box_rows, 1), numpy.inf)
+        ))
+        crossing_polygon_matrix = numpy.hstack((
+            crossing_polygon_matrix,
+            numpy.full((num_box_rows, 1), num_polygons, dtype=int)
+        ))
+
+    sort_indices = numpy.lexsort(
+        (crossing_column_matrix, crossing_polygon_matrix), axis=1
+    )
+    crossing_column_matrix = numpy.take_along_axis(
+        crossing_column_matrix, sort_indices, axis=1
+    )
+
+    span_rows = numpy.repeat(box_rows, crossing_column_matrix.shape[1] // 2)
+    span_start_columns = numpy.ravel(crossing_column_matrix[:, 0::2])
+    span_end_columns = numpy.ravel(crossing_column_matrix[:, 1::2])
+
+    # Horizontal edges lie on the scanline and are filled as extra spans.
+    horizontal_edge_indices = numpy.where(numpy.logical_and(
+        first_row_by_edge == second_row_by_edge,
+        numpy.isclose(first_row_by_edge, numpy.round(first_row_by_edge))
+    ))[0]
+
+    span_rows = numpy.concatenate((
+        span_rows,
+        numpy.round(first_row_by_edge[horizontal_edge_indices]).astype(int)
+    ))
+    span_start_columns = numpy.concatenate((
+        span_start_columns,
+        numpy.minimum(first_column_by_edge[horizontal_edge_indices],
+                      second_column_by_edge[horizontal_edge_indices])
+    ))
+    span_end_columns = numpy.concatenate((
+        span_end_columns,
+        numpy.maximum(first_column_by_edge[horizontal_edge_indices],
+                      second_column_by_edge[horizontal_edge_indices])
     ))
 
-    vertex_rows_by_polygon = general_utils.split_array_by_nan(vertex_rows)
-    vertex_columns_by_polygon = general_utils.split_array_by_nan(vertex_columns)
+    good_span_flags = numpy.logical_and(
+        numpy.isfinite(span_end_columns),
+        numpy.logical_and(span_rows >= first_box_row,
+                          span_rows <= last_box_row)
+    )
+    span_rows = span_rows[good_span_flags]
+    span_start_columns = span_start_columns[good_span_flags]
+    span_end_columns = span_end_columns[good_span_flags]
+
+    # Spans include grid points on their endpoints, so rounding error must not
+    # push an endpoint across a grid point.
+    span_start_columns = numpy.ceil(
+        span_start_columns - SCANLINE_TOLERANCE
+    ).astype(int)
+    span_end_columns = 1 + numpy.floor(
+        span_end_columns + SCANLINE_TOLERANCE
+    ).astype(int)
 
-    num_polygons = len(vertex_rows_by_polygon)
-    polygon_objects_grid_coords = []
+    span_start_columns = numpy.maximum(span_start_columns, first_box_column)
+    span_end_columns = numpy.minimum(span_end_columns, last_box_column + 1)
 
-    for i in range(num_polygons):
-        this_polygon_object = polygons.vertex_arrays_to_polygon(
-            x_coordinates=vertex_columns_by_polygon[i],
-            y_coordinates=vertex_rows_by_polygon[i]
+    good_span_flags = span_end_columns > span_start_columns
+    span_rows = span_rows[good_span_flags]
+
+    # Spans are filled by adding +1 at the start and -1 after the end, then
+    # taking the cumulative sum along each row of the bounding box.
+    fill_count_matrix = numpy.full(
+        (num_box_rows, num_box_columns + 1), 0, dtype=int
+    )
+    numpy.add.at(
+        fill_count_matrix,
+        (span_rows - first_box_row,
+         span_start_columns[good_span_flags] - first_box_column),
+        1
+    )
+    numpy.add.at(
+        fill_count_matrix,
+        (span_rows - first_box_row,
+         span_end_columns[good_span_flags] - first_box_column),
+        -1
+    )
+
+    mask_matrix[
+        first_box_row:(last_box_row + 1),
+        first_box_column:(last_box_column + 1)
+    ] = numpy.cumsum(fill_count_matrix, axis=1)[:, :-1] > 0
+
+    # A vertex at a local maximum in row is not crossed by either edge, so
+    # vertices on grid points are filled separately.
+    vertex_row_indices = numpy.round(vertex_rows).astype(int)
+    vertex_column_indices = numpy.round(vertex_columns).astype(int)
+
+    good_vertex_flags = numpy.logical_and(
+        numpy.logical_and(
+            numpy.isclose(vertex_rows, vertex_row_indices),
+            numpy.isclose(vertex_columns, vertex_column_indices)
+        ),
+        numpy.logical_and(
+            numpy.logical_and(vertex_row_indices >= 0,
+                              vertex_row_indices < num_grid_rows),
+            numpy.logical_and(vertex_column_indices >= 0,
+                              vertex_column_indices < num_grid_columns)
         )
+    )
 
-        polygon_objects_grid_coords.append(this_polygon_object)
+    mask_matrix[
+        vertex_row_indices[good_vertex_flags],
+        vertex_column_indices[good_vertex_flags]
+    ] = True
 
-    return polygon_objects_grid_coords, polygon_to_first_vertex_indices
+    return mask_matrix
 
 
 def _polygons_to_mask_one_panel(polygon_objects_grid_coords, num_grid_rows,
-                                num_grid_columns):
+                                num_grid_columns, mask_matrix=None):
     """Converts list of polygons to binary mask.
 
     M = number of rows in grid
@@ -213,46 +937,41 @@ def _polygons_to_mask_one_panel(polygon_objects_grid_coords, num_grid_rows,
         `polygons_from_pixel_to_grid_coords`.
     :param num_grid_rows: Same.
     :param num_grid_columns: Same.
+    :param mask_matrix: M-by-N numpy array of Boolean flags, which will be
+        updated in place.  If None, this method will start with a mask of all
+        False.
     :return: mask_matrix: M-by-N numpy array of Boolean flags.  If
         mask_matrix[i, j] == True, grid point [i, j] is in/on at least one of
         the polygons.
     """
 
-    mask_matrix = numpy.full(
-        (num_grid_rows, num_grid_columns), False, dtype=bool
-    )
+    if mask_matrix is None:
+        mask_matrix = numpy.full(
+            (num_grid_rows, num_grid_columns), False, dtype=bool
+        )
 
     num_polygons = len(polygon_objects_grid_coords)
     if num_polygons == 0:
         return mask_matrix
 
-    # TODO(thunderhoser): This triple for-loop is probably inefficient.
-    for k in range(num_polygons):
-        these_grid_columns = numpy.array(
-            polygon_objects_grid_coords[k].exterior.xy[0]
-        )
-
-        error_checking.assert_is_geq_numpy_array(these_grid_columns, -0.5)
-        error_checking.assert_is_leq_numpy_array(
-            these_grid_columns, num_grid_columns - 0.5)
-
-        these_grid_rows = numpy.array(
-            polygon_objects_grid_coords[k].exterior.xy[1]
-        )
+    # Vertices of all polygons are checked and rasterized together.
+    (grid_column_by_vertex, grid_row_by_vertex, polygon_to_first_vertex_indices
+    ) = _polygons_to_vertex_arrays(polygon_objects_grid_coords)
 
-        error_checking.assert_is_geq_numpy_array(these_grid_rows, -0.5)
-        error_checking.assert_is_leq_numpy_array(
-            these_grid_rows, num_grid_rows - 0.5)
+    error_checking.assert_is_geq_numpy_array(grid_column_by_vertex, -0.5)
+    error_checking.assert_is_leq_numpy_array(
+        grid_column_by_vertex, num_grid_columns - 0.5)
 
-        for i in range(num_grid_rows):
-            for j in range(num_grid_columns):
-                if mask_matrix[i, j]:
-                    continue
+    error_checking.assert_is_geq_numpy_array(grid_row_by_vertex, -0.5)
+    error_checking.assert_is_leq_numpy_array(
+        grid_row_by_vertex, num_grid_rows - 0.5)
 
-                mask_matrix[i, j] = polygons.point_in_or_on_polygon(
-                    polygon_object=polygon_objects_grid_coords[k],
-                    query_x_coordinate=j, query_y_coordinate=i)
+    this_mask_matrix = _rasterize_polygons(
+        vertex_rows=grid_row_by_vertex, vertex_columns=grid_column_by_vertex,
+        polygon_to_first_vertex_indices=polygon_to_first_vertex_indices,
+        num_grid_rows=num_grid_rows, num_grid_columns=num_grid_columns)
 
+    numpy.logical_or(mask_matrix, this_mask_matrix, out=mask_matrix)
     return mask_matrix
 
 
@@ -292,13 +1011,49 @@ def _click_handler(event_object):
     return x_coords_px, y_coords_px
 
 
+def read_image(image_file_name):
+    """Reads image from file.
+
+    The image is converted the same way as by `pyplot.imshow`, so palette and
+    grey-plus-alpha images are returned as RGBA.
+
+    :param image_file_name: Path to image file.
+    :return: image_matrix: numpy array of pixel values, where the first axis is
+        pixel row and the second is pixel column.
+    """
+
+    error_checking.assert_file_exists(image_file_name)
+    with Image.open(image_file_name) as image_object:
+        return matplotlib.image.pil_to_array(image_object)
+
+
 def capture_polygons(image_file_name, instruction_string=''):
     """This interactiv method allows you to draw polygons and captures vertices.
 
-    N = number of polygons drawn
-
     :param image_file_name: Path to image file.  This method will display the
         image in a figure window and allow you to draw polygons on top.
+    :param instruction_string: See doc for `capture_polygons_from_array`.
+    :return: polygon_objects_pixel_coords: Same.
+    :return: num_pixel_rows: Same.
+    :return: num_pixel_columns: Same.
+    """
+
+    return capture_polygons_from_array(
+        image_matrix=read_image(image_file_name),
+        instruction_string=instruction_string)
+
+
+def capture_polygons_from_array(image_matrix, instruction_string=''):
+    """Same as `capture_polygons`, but for an image already in memory.
+
+    Use this method to draw more than one set of polygons over the same image,
+    without decoding the image file each time.
+
+    N = number of polygons drawn
+
+    :param image_matrix: numpy array of pixel values, created by `read_image`.
+        This method will display the image in a figure window and allow you to
+        draw polygons on top.
     :param instruction_string: String with instructions for the user.
     :return: polygon_objects_pixel_coords: length-N list of polygons (instances
         of `shapely.geometry.Polygon`), each containing vertices in pixel
@@ -307,11 +1062,10 @@ def capture_polygons(image_file_name, instruction_string=''):
     :return: num_pixel_columns: Number of pixel columns in the image.
     """
 
-    error_checking.assert_file_exists(image_file_name)
+    error_checking.assert_is_numpy_array(image_matrix)
     error_checking.assert_is_string(instruction_string)
 
-    image_matrix = Image.open(image_file_name)
-    num_pixel_columns, num_pixel_rows = image_matrix.size
+    num_pixel_rows, num_pixel_columns = image_matrix.shape[:2]
 
     pyplot.imshow(image_matrix)
     pyplot.title(instruction_string)
@@ -319,22 +1073,18 @@ def capture_polygons(image_file_name, instruction_string=''):
 
     multi_roi_object = MultiRoi()
 
-    string_keys = list(multi_roi_object.rois.keys())
-    integer_keys = numpy.array([int(k) for k in string_keys], dtype=int)
-
-    sort_indices = numpy.argsort(integer_keys)
-    integer_keys = integer_keys[sort_indices]
-    string_keys = [string_keys[k] for k in sort_indices]
+    # ROIs are keyed by strings, but must be sorted in numerical order.
+    roi_objects = [
+        v for _, v in
+        sorted(multi_roi_object.rois.items(), key=lambda kv: int(kv[0]))
+    ]
 
-    num_polygons = len(integer_keys)
     polygon_objects_pixel_coords = []
 
-    for i in range(num_polygons):
-        this_roi_object = multi_roi_object.rois[string_keys[i]]
-
-        these_x_coords = numpy.array(
-            [this_roi_object.x[0]] + list(reversed(this_roi_object.x))
-        )
+    for this_roi_object in roi_objects:
+        these_x_coords = numpy.concatenate((
+            this_roi_object.x[:1], this_roi_object.x[::-1]
+        )).astype(float)
 
         if len(these_x_coords) < 4:
             warning_string = (
@@ -345,9 +1095,9 @@ def capture_polygons(image_file_name, instruction_string=''):
             warnings.warn(warning_string)
             continue
 
-        these_y_coords = numpy.array(
-            [this_roi_object.y[0]] + list(reversed(this_roi_object.y))
-        )
+        these_y_coords = numpy.concatenate((
+            this_roi_object.y[:1], this_roi_object.y[::-1]
+        )).astype(float)
 
         this_polygon_object = polygons.vertex_arrays_to_polygon(
             x_coordinates=these_x_coords, y_coordinates=these_y_coords)
@@ -372,11 +1122,10 @@ def capture_mouse_clicks(image_file_name, instruction_string=''):
     :return: num_pixel_columns: Number of pixel columns in the image.
     """
 
-    error_checking.assert_file_exists(image_file_name)
     error_checking.assert_is_string(instruction_string)
 
-    image_matrix = Image.open(image_file_name)
-    num_pixel_columns, num_pixel_rows = image_matrix.size
+    image_matrix = read_image(image_file_name)
+    num_pixel_rows, num_pixel_columns = image_matrix.shape[:2]
 
     global figure_object
     figure_object = pyplot.subplots(
@@ -434,37 +1183,37 @@ def pixel_rows_to_grid_rows(
     error_checking.assert_is_leq_numpy_array(
         pixel_row_by_vertex, num_pixel_rows)
 
-    panel_row_to_first_px_row = {}
-    for i in range(num_panel_rows):
-        panel_row_to_first_px_row[i] = (
-            i * float(num_pixel_rows) / num_panel_rows
-        )
+    # Scale factors are computed once, so that each conversion below is one
+    # pass over the vertex array.
+    num_pixel_rows_per_panel = float(num_pixel_rows) / num_panel_rows
+    num_grid_rows_per_pixel = (
+        float(num_grid_rows * num_panel_rows) / num_pixel_rows
+    )
+
+    panel_row_to_first_px_row = (
+        numpy.arange(num_panel_rows) * num_pixel_rows_per_panel
+    )
 
     panel_row_by_vertex = numpy.floor(
-        pixel_row_by_vertex * float(num_panel_rows) / num_pixel_rows
+        pixel_row_by_vertex / num_pixel_rows_per_panel
     ).astype(int)
 
     panel_row_by_vertex[
         panel_row_by_vertex == num_panel_rows
         ] = num_panel_rows - 1
 
-    if assert_same_panel and len(numpy.unique(panel_row_by_vertex)) > 1:
+    if (assert_same_panel and len(panel_row_by_vertex) > 0 and
+            numpy.min(panel_row_by_vertex) != numpy.max(panel_row_by_vertex)):
         error_string = (
             'Object is in multiple panels.  Panel rows listed below.\n{0:s}'
         ).format(str(panel_row_by_vertex))
 
         raise ValueError(error_string)
 
-    num_vertices = len(pixel_row_by_vertex)
-    for i in range(num_vertices):
-        pixel_row_by_vertex[i] = (
-            pixel_row_by_vertex[i] -
-            panel_row_to_first_px_row[panel_row_by_vertex[i]]
-        )
+    pixel_row_by_vertex -= panel_row_to_first_px_row[panel_row_by_vertex]
 
     grid_row_by_vertex = -0.5 + (
-        pixel_row_by_vertex *
-        float(num_grid_rows * num_panel_rows) / num_pixel_rows
+        pixel_row_by_vertex * num_grid_rows_per_pixel
     )
 
     grid_row_by_vertex = num_grid_rows - 1 - grid_row_by_vertex
@@ -509,37 +1258,40 @@ def pixel_columns_to_grid_columns(
     error_checking.assert_is_leq_numpy_array(
         pixel_column_by_vertex, num_pixel_columns)
 
-    panel_column_to_first_px_column = {}
-    for j in range(num_panel_columns):
-        panel_column_to_first_px_column[j] = (
-            j * float(num_pixel_columns) / num_panel_columns
-        )
+    # Scale factors are computed once, so that each conversion below is one
+    # pass over the vertex array.
+    num_pixel_columns_per_panel = float(num_pixel_columns) / num_panel_columns
+    num_grid_columns_per_pixel = (
+        float(num_grid_columns * num_panel_columns) / num_pixel_columns
+    )
+
+    panel_column_to_first_px_column = (
+        numpy.arange(num_panel_columns) * num_pixel_columns_per_panel
+    )
 
     panel_column_by_vertex = numpy.floor(
-        pixel_column_by_vertex * float(num_panel_columns) / num_pixel_columns
+        pixel_column_by_vertex / num_pixel_columns_per_panel
     ).astype(int)
 
     panel_column_by_vertex[
         panel_column_by_vertex == num_panel_columns
     ] = num_panel_columns - 1
 
-    if assert_same_panel and len(numpy.unique(panel_column_by_vertex)) > 1:
+    if (assert_same_panel and len(panel_column_by_vertex) > 0 and
+            numpy.min(panel_column_by_vertex) !=
+            numpy.max(panel_column_by_vertex)):
         error_string = (
             'Object is in multiple panels.  Panel columns listed below.\n{0:s}'
         ).format(str(panel_column_by_vertex))
 
         raise ValueError(error_string)
 
-    num_vertices = len(pixel_column_by_vertex)
-    for i in range(num_vertices):
-        pixel_column_by_vertex[i] = (
-            pixel_column_by_vertex[i] -
-            panel_column_to_first_px_column[panel_column_by_vertex[i]]
-        )
+    pixel_column_by_vertex -= (
+        panel_column_to_first_px_column[panel_column_by_vertex]
+    )
 
     grid_column_by_vertex = -0.5 + (
-        pixel_column_by_vertex *
-        float(num_grid_columns * num_panel_columns) / num_pixel_columns
+        pixel_column_by_vertex * num_grid_columns_per_pixel
     )
 
     return grid_column_by_vertex, panel_column_by_vertex
@@ -589,69 +1341,95 @@ def polygons_from_pixel_to_grid_coords(
         empty_array = numpy.array([], dtype=int)
         return polygon_objects_pixel_coords, empty_array, empty_array
 
-    error_checking.assert_is_numpy_array(
-        numpy.array(polygon_objects_pixel_coords, dtype=object),
-        num_dimensions=1
-    )
-
-    polygon_objects_grid_coords = [None] * num_polygons
-    panel_row_by_polygon = [None] * num_polygons
-    panel_column_by_polygon = [None] * num_polygons
+    # Convert vertices of all polygons at once, then split by polygon.
+    (pixel_column_by_vertex, pixel_row_by_vertex,
+     polygon_to_first_vertex_indices
+    ) = _polygons_to_vertex_arrays(polygon_objects_pixel_coords)
 
-    for k in range(num_polygons):
-        these_grid_columns, these_panel_columns = pixel_columns_to_grid_columns(
-            pixel_column_by_vertex=numpy.array(
-                polygon_objects_pixel_coords[k].exterior.xy[0]
-            ),
+    grid_column_by_vertex, panel_column_by_vertex = (
+        pixel_columns_to_grid_columns(
+            pixel_column_by_vertex=pixel_column_by_vertex,
             num_pixel_columns=num_pixel_columns,
             num_panel_columns=num_panel_columns,
-            num_grid_columns=num_grid_columns, assert_same_panel=True)
-
-        panel_column_by_polygon[k] = these_panel_columns[0]
-
-        these_grid_rows, these_panel_rows = pixel_rows_to_grid_rows(
-            pixel_row_by_vertex=numpy.array(
-                polygon_objects_pixel_coords[k].exterior.xy[1]
-            ),
-            num_pixel_rows=num_pixel_rows, num_panel_rows=num_panel_rows,
-            num_grid_rows=num_grid_rows, assert_same_panel=True)
+            num_grid_columns=num_grid_columns, assert_same_panel=False)
+    )
 
-        panel_row_by_polygon[k] = these_panel_rows[0]
+    grid_row_by_vertex, panel_row_by_vertex = pixel_rows_to_grid_rows(
+        pixel_row_by_vertex=pixel_row_by_vertex,
+        num_pixel_rows=num_pixel_rows, num_panel_rows=num_panel_rows,
+        num_grid_rows=num_grid_rows, assert_same_panel=False)
+
+    # Each polygon is assigned to the panel containing its first vertex.  All
+    # other vertices must be in the same panel.
+    panel_column_by_polygon = panel_column_by_vertex[
+        polygon_to_first_vertex_indices]
+    panel_row_by_polygon = panel_row_by_vertex[polygon_to_first_vertex_indices]
+
+    # A polygon is in one panel iff its min and max panel are equal.
+    bad_polygon_indices = numpy.where(numpy.logical_or(
+        numpy.minimum.reduceat(
+            panel_column_by_vertex, polygon_to_first_vertex_indices) !=
+        numpy.maximum.reduceat(
+            panel_column_by_vertex, polygon_to_first_vertex_indices),
+        numpy.minimum.reduceat(
+            panel_row_by_vertex, polygon_to_first_vertex_indices) !=
+        numpy.maximum.reduceat(
+            panel_row_by_vertex, polygon_to_first_vertex_indices)
+    ))[0]
+
+    if len(bad_polygon_indices) > 0:
+        bad_polygon_index = bad_polygon_indices[0]
+        first_vertex_index = polygon_to_first_vertex_indices[bad_polygon_index]
+        last_vertex_index = numpy.concatenate((
+            polygon_to_first_vertex_indices[1:],
+            numpy.array([len(panel_row_by_vertex)], dtype=int)
+        ))[bad_polygon_index]
 
-        polygon_objects_grid_coords[k] = (
-            polygons.vertex_arrays_to_polygon(
-                x_coordinates=these_grid_columns, y_coordinates=these_grid_rows)
+        error_string = (
+            'Object is in multiple panels.  Panel rows and columns listed '
+            'below.\n{0:s}\n{1:s}'
+        ).format(
+            str(panel_row_by_vertex[first_vertex_index:last_vertex_index]),
+            str(panel_column_by_vertex[first_vertex_index:last_vertex_index])
         )
 
-    panel_row_by_polygon = numpy.array(panel_row_by_polygon, dtype=int)
-    panel_column_by_polygon = numpy.array(panel_column_by_polygon, dtype=int)
+        raise ValueError(error_string)
+
+    polygon_objects_grid_coords = _vertex_arrays_to_polygons(
+        vertex_x_coords=grid_column_by_vertex,
+        vertex_y_coords=grid_row_by_vertex,
+        polygon_to_first_vertex_indices=polygon_to_first_vertex_indices)
 
     return (polygon_objects_grid_coords, panel_row_by_polygon,
             panel_column_by_polygon)
 
 
-def polygons_to_mask(
+def polygons_to_mask_iter(
         polygon_objects_grid_coords, num_grid_rows, num_grid_columns,
         num_panel_rows, num_panel_columns, panel_row_by_polygon,
         panel_column_by_polygon):
-    """Converts list of polygons to one binary mask for each panel.
+    """Generator version of `polygons_to_mask`.
+
+    Masks are created and yielded one panel at a time, so the full
+    J-by-K-by-M-by-N array is never held in memory.  Panels are yielded in
+    row-major order.
 
     M = number of rows in grid
     N = number of columns in grid
-    J = number of panel rows in image
-    K = number of panel columns in image
 
-    :param polygon_objects_grid_coords: See doc for
-        `polygons_from_pixel_to_grid_coords`.
+    :param polygon_objects_grid_coords: See doc for `polygons_to_mask`.
     :param num_grid_rows: Same.
     :param num_grid_columns: Same.
     :param num_panel_rows: Same.
     :param num_panel_columns: Same.
     :param panel_row_by_polygon: Same.
     :param panel_column_by_polygon: Same.
-    :return: mask_matrix: J-by-K-by-M-by-N numpy array of Boolean flags.  If
-        mask_matrix[j, k, m, n] == True, grid point [m, n] in panel [j, k] is
-        in/on at least one of the polygons.
+    :return: panel_row: Panel row.
+    :return: panel_column: Panel column.
+    :return: mask_matrix: M-by-N numpy array of Boolean flags for the given
+        panel.  If mask_matrix[m, n] == True, grid point [m, n] is in/on at
+        least one of the polygons.  Each yielded array is owned by the caller
+        and may be modified in place.
     """
 
     error_checking.assert_is_integer(num_grid_rows)
@@ -665,40 +1443,178 @@ def polygons_to_mask(
         panel_row_by_polygon=panel_row_by_polygon,
         panel_column_by_polygon=panel_column_by_polygon)
 
-    mask_matrix = numpy.full(
-        (num_panel_rows, num_panel_columns, num_grid_rows, num_grid_columns),
-        False, dtype=bool
+    # Group polygons by panel with one sort.
+    num_panels = num_panel_rows * num_panel_columns
+    polygon_objects_by_panel = [[] for _ in range(num_panels)]
+
+    if len(polygon_objects_grid_coords) > 0:
+        panel_index_by_polygon = numpy.ravel_multi_index(
+            (panel_row_by_polygon, panel_column_by_polygon),
+            (num_panel_rows, num_panel_columns)
+        )
+
+        sort_indices = numpy.argsort(panel_index_by_polygon, kind='stable')
+        unique_panel_indices, first_sorted_indices = numpy.unique(
+            panel_index_by_polygon[sort_indices], return_index=True
+        )
+        polygon_indices_by_panel = numpy.split(
+            sort_indices, first_sorted_indices[1:]
+        )
+
+        for this_panel_index, these_polygon_indices in zip(
+                unique_panel_indices, polygon_indices_by_panel):
+            polygon_objects_by_panel[this_panel_index] = [
+                polygon_objects_grid_coords[k] for k in these_polygon_indices
+            ]
+
+    # If the same polygons are drawn in several panels (e.g., one outline
+    # copied to every variable), the mask is rasterized only once.  Only masks
+    # that will be copied later are kept in memory.
+    geometry_to_panel_dict = {}
+    panel_to_copied_panel_dict = {}
+    panels_to_rasterize = []
+
+    for this_panel_index in range(num_panels):
+        these_polygon_objects = polygon_objects_by_panel[this_panel_index]
+        if len(these_polygon_objects) == 0:
+            continue
+
+        this_geometry_key = b''.join([p.wkb for p in these_polygon_objects])
+
+        if this_geometry_key in geometry_to_panel_dict:
+            panel_to_copied_panel_dict[this_panel_index] = (
+                geometry_to_panel_dict[this_geometry_key]
+            )
+            continue
+
+        geometry_to_panel_dict[this_geometry_key] = this_panel_index
+        panels_to_rasterize.append(this_panel_index)
+
+    copied_panel_to_mask_dict = dict.fromkeys(
+        panel_to_copied_panel_dict.values()
     )
 
-    num_polygons = len(polygon_objects_grid_coords)
-    if num_polygons == 0:
-        return mask_matrix
+    # Panels are independent, so they can be rasterized in parallel.  Threads
+    # are used because numpy releases the GIL for large array operations.
+    # Panels are rasterized in batches of one per worker, so that memory use
+    # stays proportional to the number of workers.
+    num_workers = max([
+        min([len(panels_to_rasterize), os.cpu_count() or 1]), 1
+    ])
 
-    panel_coord_matrix = numpy.hstack((
-        numpy.reshape(panel_row_by_polygon, (num_polygons, 1)),
-        numpy.reshape(panel_column_by_polygon, (num_polygons, 1))
-    ))
+    first_panel_to_batch_dict = dict([
+        (panels_to_rasterize[i], panels_to_rasterize[i:(i + num_workers)])
+        for i in range(0, len(panels_to_rasterize), num_workers)
+    ])
 
-    panel_coord_matrix = numpy.unique(panel_coord_matrix.astype(int), axis=0)
+    executor_object = (
+        ThreadPoolExecutor(max_workers=num_workers) if num_workers > 1
+        else None
+    )
+    panel_to_mask_dict = {}
+
+    try:
+        for this_panel_index in range(num_panels):
+            this_panel_row, this_panel_column = numpy.unravel_index(
+                this_panel_index, (num_panel_rows, num_panel_columns)
+            )
+
+            if this_panel_index in panel_to_copied_panel_dict:
+                yield (
+                    this_panel_row, this_panel_column,
+                    copied_panel_to_mask_dict[
+                        panel_to_copied_panel_dict[this_panel_index]
+                    ].copy()
+                )
+                continue
+
+            if this_panel_index in first_panel_to_batch_dict:
+                these_panel_indices = first_panel_to_batch_dict[
+                    this_panel_index]
+                these_polygon_object_lists = [
+                    polygon_objects_by_panel[k] for k in these_panel_indices
+                ]
+
+                if executor_object is None:
+                    these_mask_matrices = [
+                        _polygons_to_mask_one_panel(
+                            polygon_objects_grid_coords=p,
+                            num_grid_rows=num_grid_rows,
+                            num_grid_columns=num_grid_columns)
+                        for p in these_polygon_object_lists
+                    ]
+                else:
+                    these_mask_matrices = executor_object.map(
+                        lambda p: _polygons_to_mask_one_panel(
+                            polygon_objects_grid_coords=p,
+                            num_grid_rows=num_grid_rows,
+                            num_grid_columns=num_grid_columns),
+                        these_polygon_object_lists
+                    )
+
+                panel_to_mask_dict.update(
+                    zip(these_panel_indices, these_mask_matrices)
+                )
+
+            if this_panel_index in panel_to_mask_dict:
+                this_mask_matrix = panel_to_mask_dict.pop(this_panel_index)
+            else:
+                this_mask_matrix = numpy.full(
+                    (num_grid_rows, num_grid_columns), False, dtype=bool
+                )
+
+            # Keep a private copy, so that changes made by the caller to the
+            # yielded mask do not leak into panels copied from it.
+            if this_panel_index in copied_panel_to_mask_dict:
+                copied_panel_to_mask_dict[this_panel_index] = (
+                    this_mask_matrix.copy()
+                )
+
+            yield this_panel_row, this_panel_column, this_mask_matrix
+    finally:
+        if executor_object is not None:
+            executor_object.shutdown()
 
-    for i in range(panel_coord_matrix.shape[0]):
-        this_panel_row = panel_coord_matrix[i, 0]
-        this_panel_column = panel_coord_matrix[i, 1]
 
-        these_polygon_indices = numpy.where(numpy.logical_and(
-            panel_row_by_polygon == this_panel_row,
-            panel_column_by_polygon == this_panel_column
-        ))[0]
+def polygons_to_mask(
+        polygon_objects_grid_coords, num_grid_rows, num_grid_columns,
+        num_panel_rows, num_panel_columns, panel_row_by_polygon,
+        panel_column_by_polygon):
+    """Converts list of polygons to one binary mask for each panel.
 
-        these_polygon_objects = [
-            polygon_objects_grid_coords[k] for k in these_polygon_indices
-        ]
+    M = number of rows in grid
+    N = number of columns in grid
+    J = number of panel rows in image
+    K = number of panel columns in image
 
-        mask_matrix[this_panel_row, this_panel_column, ...] = (
-            _polygons_to_mask_one_panel(
-                polygon_objects_grid_coords=these_polygon_objects,
-                num_grid_rows=num_grid_rows, num_grid_columns=num_grid_columns)
-        )
+    :param polygon_objects_grid_coords: See doc for
+        `polygons_from_pixel_to_grid_coords`.
+    :param num_grid_rows: Same.
+    :param num_grid_columns: Same.
+    :param num_panel_rows: Same.
+    :param num_panel_columns: Same.
+    :param panel_row_by_polygon: Same.
+    :param panel_column_by_polygon: Same.
+    :return: mask_matrix: J-by-K-by-M-by-N numpy array of Boolean flags.  If
+        mask_matrix[j, k, m, n] == True, grid point [m, n] in panel [j, k] is
+        in/on at least one of the polygons.
+    """
+
+    mask_matrix = numpy.full(
+        (num_panel_rows, num_panel_columns, num_grid_rows, num_grid_columns),
+        False, dtype=bool
+    )
+
+    for this_panel_row, this_panel_column, this_mask_matrix in (
+            polygons_to_mask_iter(
+                polygon_objects_grid_coords=polygon_objects_grid_coords,
+                num_grid_rows=num_grid_rows, num_grid_columns=num_grid_columns,
+                num_panel_rows=num_panel_rows,
+                num_panel_columns=num_panel_columns,
+                panel_row_by_polygon=panel_row_by_polygon,
+                panel_column_by_polygon=panel_column_by_polygon)
+    ):
+        mask_matrix[this_panel_row, this_panel_column, ...] = this_mask_matrix
 
     return mask_matrix
 
@@ -709,7 +1625,7 @@ def write_polygons(
         positive_mask_matrix, negative_objects_grid_coords=None,
         negative_panel_row_by_polygon=None,
         negative_panel_column_by_polygon=None, negative_mask_matrix=None,
-        full_storm_id_string=None, storm_time_unix_sec=None):
+        full_storm_id_string=None, storm_time_unix_sec=None, store_masks=True):
     """Writes human polygons for one image to NetCDF file.
 
     P = number of positive regions of interest
@@ -738,6 +1654,9 @@ def write_polygons(
         composite, this should be None).
     :param storm_time_unix_sec: Valid time (if polygons were drawn for
         composite, this should be None).
+    :param store_masks: Boolean flag.  If True, will write masks along with
+        polygons.  If False, will write only polygons, and masks will be
+        recomputed from polygons by `read_polygons`.
     """
 
     is_composite = (
@@ -750,6 +1669,7 @@ def write_polygons(
 
     error_checking.assert_is_string(full_storm_id_string)
     error_checking.assert_is_integer(storm_time_unix_sec)
+    error_checking.assert_is_boolean(store_masks)
 
     error_checking.assert_is_boolean_numpy_array(positive_mask_matrix)
     error_checking.assert_is_numpy_array(positive_mask_matrix, num_dimensions=4)
@@ -784,15 +1704,21 @@ def write_polygons(
     (positive_vertex_rows, positive_vertex_columns, these_vertex_to_poly_indices
      ) = _polygon_list_to_vertex_list(positive_objects_grid_coords)
 
-    positive_panel_row_by_vertex = numpy.array([
-        positive_panel_row_by_polygon[k] if k >= 0 else numpy.nan
-        for k in these_vertex_to_poly_indices
-    ])
+    positive_panel_row_by_vertex = numpy.where(
+        these_vertex_to_poly_indices >= 0,
+        positive_panel_row_by_polygon[
+            numpy.maximum(these_vertex_to_poly_indices, 0)
+        ],
+        -1
+    )
 
-    positive_panel_column_by_vertex = numpy.array([
-        positive_panel_column_by_polygon[k] if k >= 0 else numpy.nan
-        for k in these_vertex_to_poly_indices
-    ])
+    positive_panel_column_by_vertex = numpy.where(
+        these_vertex_to_poly_indices >= 0,
+        positive_panel_column_by_polygon[
+            numpy.maximum(these_vertex_to_poly_indices, 0)
+        ],
+        -1
+    )
 
     if len(positive_vertex_rows) == 0:
         positive_vertex_rows = numpy.full(1, SENTINEL_VALUE - 1)
@@ -803,19 +1729,58 @@ def write_polygons(
     (negative_vertex_rows, negative_vertex_columns, these_vertex_to_poly_indices
      ) = _polygon_list_to_vertex_list(negative_objects_grid_coords)
 
-    negative_panel_row_by_vertex = numpy.array([
-        negative_panel_row_by_polygon[k] if k >= 0 else numpy.nan
-        for k in these_vertex_to_poly_indices
-    ])
+    negative_panel_row_by_vertex = numpy.where(
+        these_vertex_to_poly_indices >= 0,
+        negative_panel_row_by_polygon[
+            numpy.maximum(these_vertex_to_poly_indices, 0)
+        ],
+        -1
+    )
 
-    negative_panel_column_by_vertex = numpy.array([
-        negative_panel_column_by_polygon[k] if k >= 0 else numpy.nan
-        for k in these_vertex_to_poly_indices
-    ])
+    negative_panel_column_by_vertex = numpy.where(
+        these_vertex_to_poly_indices >= 0,
+        negative_panel_column_by_polygon[
+            numpy.maximum(these_vertex_to_poly_indices, 0)
+        ],
+        -1
+    )
+
+    # Arrays are cast to the storage type here, in one vectorized operation
+    # each, so that netCDF4 does not have to cast them on write.  Panel indices
+    # (including the separator value of -1) fit in one byte unless there are
+    # more than 127 panel rows or columns.
+    if max(positive_mask_matrix.shape[:2]) <= numpy.iinfo(numpy.int8).max:
+        panel_index_datatype = numpy.int8
+    else:
+        panel_index_datatype = numpy.int32
+
+    # Row and column of each vertex are stored together, in one V-by-2 array.
+    # Each array is allocated once with the storage type and filled in place,
+    # which casts the coordinates without an intermediate float64 copy.
+    positive_vertex_coord_matrix = numpy.empty(
+        (len(positive_vertex_rows), 2), dtype=numpy.float32
+    )
+    positive_vertex_coord_matrix[:, 0] = positive_vertex_rows
+    positive_vertex_coord_matrix[:, 1] = positive_vertex_columns
+
+    negative_vertex_coord_matrix = numpy.empty(
+        (len(negative_vertex_rows), 2), dtype=numpy.float32
+    )
+    negative_vertex_coord_matrix[:, 0] = negative_vertex_rows
+    negative_vertex_coord_matrix[:, 1] = negative_vertex_columns
+
+    positive_panel_row_by_vertex = positive_panel_row_by_vertex.astype(
+        panel_index_datatype)
+    positive_panel_column_by_vertex = positive_panel_column_by_vertex.astype(
+        panel_index_datatype)
+    negative_panel_row_by_vertex = negative_panel_row_by_vertex.astype(
+        panel_index_datatype)
+    negative_panel_column_by_vertex = negative_panel_column_by_vertex.astype(
+        panel_index_datatype)
 
     file_system_utils.mkdir_recursive_if_necessary(file_name=output_file_name)
     dataset_object = netCDF4.Dataset(
-        output_file_name, 'w', format='NETCDF3_64BIT_OFFSET')
+        output_file_name, 'w', format='NETCDF4')
 
     dataset_object.setncattr(STORM_ID_KEY, full_storm_id_string)
     dataset_object.setncattr(STORM_TIME_KEY, storm_time_unix_sec)
@@ -838,30 +1803,25 @@ def write_polygons(
     dataset_object.createDimension(
         NEGATIVE_VERTEX_DIM_KEY, len(negative_vertex_rows)
     )
+    dataset_object.createDimension(VERTEX_COORD_DIM_KEY, 2)
 
     dataset_object.createVariable(
-        POSITIVE_VERTEX_ROWS_KEY, datatype=numpy.float32,
-        dimensions=POSITIVE_VERTEX_DIM_KEY
-    )
-    dataset_object.variables[POSITIVE_VERTEX_ROWS_KEY][:] = positive_vertex_rows
-
-    dataset_object.createVariable(
-        POSITIVE_VERTEX_COLUMNS_KEY, datatype=numpy.float32,
-        dimensions=POSITIVE_VERTEX_DIM_KEY
+        POSITIVE_VERTICES_KEY, datatype=numpy.float32,
+        dimensions=(POSITIVE_VERTEX_DIM_KEY, VERTEX_COORD_DIM_KEY)
     )
-    dataset_object.variables[POSITIVE_VERTEX_COLUMNS_KEY][:] = (
-        positive_vertex_columns
+    dataset_object.variables[POSITIVE_VERTICES_KEY][:] = (
+        positive_vertex_coord_matrix
     )
 
     dataset_object.createVariable(
-        POSITIVE_PANEL_ROW_BY_VERTEX_KEY, datatype=numpy.int32,
+        POSITIVE_PANEL_ROW_BY_VERTEX_KEY, datatype=panel_index_datatype,
         dimensions=POSITIVE_VERTEX_DIM_KEY
     )
     dataset_object.variables[
         POSITIVE_PANEL_ROW_BY_VERTEX_KEY][:] = positive_panel_row_by_vertex
 
     dataset_object.createVariable(
-        POSITIVE_PANEL_COLUMN_BY_VERTEX_KEY, datatype=numpy.int32,
+        POSITIVE_PANEL_COLUMN_BY_VERTEX_KEY, datatype=panel_index_datatype,
         dimensions=POSITIVE_VERTEX_DIM_KEY
     )
     dataset_object.variables[
@@ -869,59 +1829,70 @@ def write_polygons(
     ][:] = positive_panel_column_by_vertex
 
     dataset_object.createVariable(
-        NEGATIVE_VERTEX_ROWS_KEY, datatype=numpy.float32,
-        dimensions=NEGATIVE_VERTEX_DIM_KEY
+        NEGATIVE_VERTICES_KEY, datatype=numpy.float32,
+        dimensions=(NEGATIVE_VERTEX_DIM_KEY, VERTEX_COORD_DIM_KEY)
     )
-    dataset_object.variables[NEGATIVE_VERTEX_ROWS_KEY][:] = negative_vertex_rows
-
-    dataset_object.createVariable(
-        NEGATIVE_VERTEX_COLUMNS_KEY, datatype=numpy.float32,
-        dimensions=NEGATIVE_VERTEX_DIM_KEY
-    )
-    dataset_object.variables[NEGATIVE_VERTEX_COLUMNS_KEY][:] = (
-        negative_vertex_columns
+    dataset_object.variables[NEGATIVE_VERTICES_KEY][:] = (
+        negative_vertex_coord_matrix
     )
 
     dataset_object.createVariable(
-        NEGATIVE_PANEL_ROW_BY_VERTEX_KEY, datatype=numpy.int32,
+        NEGATIVE_PANEL_ROW_BY_VERTEX_KEY, datatype=panel_index_datatype,
         dimensions=NEGATIVE_VERTEX_DIM_KEY
     )
     dataset_object.variables[
         NEGATIVE_PANEL_ROW_BY_VERTEX_KEY][:] = negative_panel_row_by_vertex
 
     dataset_object.createVariable(
-        NEGATIVE_PANEL_COLUMN_BY_VERTEX_KEY, datatype=numpy.int32,
+        NEGATIVE_PANEL_COLUMN_BY_VERTEX_KEY, datatype=panel_index_datatype,
         dimensions=NEGATIVE_VERTEX_DIM_KEY
     )
     dataset_object.variables[
         NEGATIVE_PANEL_COLUMN_BY_VERTEX_KEY
     ][:] = negative_panel_column_by_vertex
 
-    dataset_object.createVariable(
-        POSITIVE_MASK_MATRIX_KEY, datatype=numpy.int32,
-        dimensions=(PANEL_ROW_DIMENSION_KEY, PANEL_COLUMN_DIMENSION_KEY,
-                    GRID_ROW_DIMENSION_KEY, GRID_COLUMN_DIMENSION_KEY)
-    )
-    dataset_object.variables[POSITIVE_MASK_MATRIX_KEY][:] = (
-        positive_mask_matrix.astype(int)
-    )
+    if not store_masks:
+        dataset_object.close()
+        return
 
+    # Masks are mostly zero, so they compress very well.  Each chunk is one
+    # panel, so reading one panel does not decompress the others.
     dataset_object.createVariable(
-        NEGATIVE_MASK_MATRIX_KEY, datatype=numpy.int32,
+        PACKED_MASK_MATRIX_KEY, datatype=numpy.uint8,
         dimensions=(PANEL_ROW_DIMENSION_KEY, PANEL_COLUMN_DIMENSION_KEY,
-                    GRID_ROW_DIMENSION_KEY, GRID_COLUMN_DIMENSION_KEY)
-    )
-    dataset_object.variables[NEGATIVE_MASK_MATRIX_KEY][:] = (
-        negative_mask_matrix.astype(int)
+                    GRID_ROW_DIMENSION_KEY, GRID_COLUMN_DIMENSION_KEY),
+        zlib=True, shuffle=True, complevel=MASK_COMPRESSION_LEVEL,
+        chunksizes=(1, 1) + positive_mask_matrix.shape[2:]
     )
 
+    # Masks are packed and written one panel at a time, so that no packed copy
+    # of the full J-by-K-by-M-by-N array is created.
+    for this_panel_row in range(positive_mask_matrix.shape[0]):
+        for this_panel_column in range(positive_mask_matrix.shape[1]):
+            dataset_object.variables[PACKED_MASK_MATRIX_KEY][
+                this_panel_row, this_panel_column, ...
+            ] = _pack_masks(
+                positive_mask_matrix=positive_mask_matrix[
+                    this_panel_row, this_panel_column, ...],
+                negative_mask_matrix=negative_mask_matrix[
+                    this_panel_row, this_panel_column, ...]
+            )
+
     dataset_object.close()
 
 
-def read_polygons(netcdf_file_name):
+def read_polygons(netcdf_file_name, use_cache=False):
     """Reads human polygons for one image from NetCDF file.
 
     :param netcdf_file_name: Path to input file.
+    :param use_cache: Boolean flag.  If True, the polygons and masks will be
+        cached in a numpy archive beside the NetCDF file (with the same name
+        plus `CACHE_FILE_SUFFIX`).  Later calls will read the cache instead of
+        the NetCDF file, as long as the NetCDF file has the same size and
+        modification time as when the cache was written.  If the cache is
+        stale or unreadable, it is rewritten from the NetCDF file.  If the
+        cache cannot be written (e.g., in a read-only directory), a warning is
+        issued.  This is useful when the same file is read many times.
     :return: polygon_dict: Dictionary with the following keys.
     polygon_dict['full_storm_id_string']: See input doc for `write_polygons`.
     polygon_dict['storm_time_unix_sec']: Same.
@@ -933,100 +1904,135 @@ def read_polygons(netcdf_file_name):
     polygon_dict['negative_panel_row_by_polygon']: Same.
     polygon_dict['negative_panel_column_by_polygon']: Same.
     polygon_dict['negative_mask_matrix']: Same.
+    polygon_dict['positive_polygon_coord_matrix']: numpy array with vertices of
+        all positive polygons, stored contiguously.  See doc for
+        `_read_polygons_one_sign`.
+    polygon_dict['positive_polygon_vertex_offsets']: numpy array of indices
+        into rows of `positive_polygon_coord_matrix`.  See doc for
+        `_read_polygons_one_sign`.
+    polygon_dict['negative_polygon_coord_matrix']: Same but for negative
+        polygons.
+    polygon_dict['negative_polygon_vertex_offsets']: Same but for negative
+        polygons.
     """
 
     error_checking.assert_file_exists(netcdf_file_name)
-    dataset_object = netCDF4.Dataset(netcdf_file_name)
-
-    polygon_dict = {
-        STORM_ID_KEY: str(getattr(dataset_object, STORM_ID_KEY)),
-        STORM_TIME_KEY: int(numpy.round(
-            getattr(dataset_object, STORM_TIME_KEY)
-        )),
-        POSITIVE_MASK_MATRIX_KEY: numpy.array(
-            dataset_object.variables[POSITIVE_MASK_MATRIX_KEY][:], dtype=bool
-        ),
-        NEGATIVE_MASK_MATRIX_KEY: numpy.array(
-            dataset_object.variables[NEGATIVE_MASK_MATRIX_KEY][:], dtype=bool
-        )
-    }
-
-    if polygon_dict[STORM_ID_KEY] == DUMMY_STORM_ID_STRING:
-        polygon_dict[STORM_ID_KEY] = None
-        polygon_dict[STORM_TIME_KEY] = None
-
-    positive_vertex_rows = numpy.array(
-        dataset_object.variables[POSITIVE_VERTEX_ROWS_KEY][:], dtype=float
-    )
-    positive_vertex_columns = numpy.array(
-        dataset_object.variables[POSITIVE_VERTEX_COLUMNS_KEY][:], dtype=float
-    )
-
-    if positive_vertex_rows[0] <= SENTINEL_VALUE:
-        positive_objects_grid_coords = []
-        positive_panel_row_by_polygon = numpy.array([], dtype=int)
-        positive_panel_column_by_polygon = numpy.array([], dtype=int)
-    else:
-        positive_objects_grid_coords, these_poly_to_first_vertex_indices = (
-            _vertex_list_to_polygon_list(
-                vertex_rows=positive_vertex_rows,
-                vertex_columns=positive_vertex_columns)
-        )
-
-        positive_panel_row_by_vertex = numpy.array(
-            dataset_object.variables[POSITIVE_PANEL_ROW_BY_VERTEX_KEY][:],
-            dtype=int
-        )
-
-        positive_panel_row_by_polygon = positive_panel_row_by_vertex[
-            these_poly_to_first_vertex_indices]
+    error_checking.assert_is_boolean(use_cache)
+
+    cache_file_name = '{0:s}{1:s}'.format(netcdf_file_name, CACHE_FILE_SUFFIX)
+    netcdf_file_stats = os.stat(netcdf_file_name)
+
+    if use_cache and os.path.isfile(cache_file_name):
+        try:
+            polygon_dict = _read_polygon_cache(
+                cache_file_name=cache_file_name,
+                netcdf_file_stats=netcdf_file_stats)
+        except (OSError, EOFError, KeyError, ValueError,
+                zipfile.BadZipFile) as this_error:
+            warning_string = (
+                'Could not read cache file "{0:s}" ({1:s}).  Reading NetCDF '
+                'file instead and rewriting cache.'
+            ).format(cache_file_name, str(this_error))
 
-        positive_panel_column_by_vertex = numpy.array(
-            dataset_object.variables[POSITIVE_PANEL_COLUMN_BY_VERTEX_KEY][:],
-            dtype=int
+            warnings.warn(warning_string)
+            polygon_dict = None
+
+        if polygon_dict is not None:
+            return polygon_dict
+
+    with netCDF4.Dataset(netcdf_file_name) as dataset_object:
+        polygon_dict = {
+            STORM_ID_KEY: str(getattr(dataset_object, STORM_ID_KEY)),
+            STORM_TIME_KEY: int(numpy.round(
+                getattr(dataset_object, STORM_TIME_KEY)
+            ))
+        }
+
+        # Older files contain one variable per mask, rather than the packed
+        # mask.
+        if PACKED_MASK_MATRIX_KEY in dataset_object.variables:
+            (polygon_dict[POSITIVE_MASK_MATRIX_KEY],
+             polygon_dict[NEGATIVE_MASK_MATRIX_KEY]
+            ) = _unpack_masks(
+                _read_netcdf_variable(
+                    dataset_object=dataset_object,
+                    variable_name=PACKED_MASK_MATRIX_KEY, dtype=numpy.uint8)
+            )
+        elif POSITIVE_MASK_MATRIX_KEY in dataset_object.variables:
+            polygon_dict[POSITIVE_MASK_MATRIX_KEY] = _read_netcdf_variable(
+                dataset_object=dataset_object,
+                variable_name=POSITIVE_MASK_MATRIX_KEY, dtype=bool)
+            polygon_dict[NEGATIVE_MASK_MATRIX_KEY] = _read_netcdf_variable(
+                dataset_object=dataset_object,
+                variable_name=NEGATIVE_MASK_MATRIX_KEY, dtype=bool)
+
+        # Masks are not in the file if written with `store_masks = False`.  In
+        # this case they are recomputed from polygons after the polygons are
+        # read.
+        mask_dimensions = tuple([
+            len(dataset_object.dimensions[d]) for d in
+            (PANEL_ROW_DIMENSION_KEY, PANEL_COLUMN_DIMENSION_KEY,
+             GRID_ROW_DIMENSION_KEY, GRID_COLUMN_DIMENSION_KEY)
+        ])
+
+        if polygon_dict[STORM_ID_KEY] == DUMMY_STORM_ID_STRING:
+            polygon_dict[STORM_ID_KEY] = None
+            polygon_dict[STORM_TIME_KEY] = None
+
+        (polygon_dict[POSITIVE_POLYGON_OBJECTS_KEY],
+         polygon_dict[POSITIVE_PANEL_ROW_BY_POLY_KEY],
+         polygon_dict[POSITIVE_PANEL_COLUMN_BY_POLY_KEY],
+         polygon_dict[POSITIVE_POLYGON_COORDS_KEY],
+         polygon_dict[POSITIVE_POLYGON_OFFSETS_KEY]
+        ) = _read_polygons_one_sign(
+            dataset_object=dataset_object, positive=True)
+
+        (polygon_dict[NEGATIVE_POLYGON_OBJECTS_KEY],
+         polygon_dict[NEGATIVE_PANEL_ROW_BY_POLY_KEY],
+         polygon_dict[NEGATIVE_PANEL_COLUMN_BY_POLY_KEY],
+         polygon_dict[NEGATIVE_POLYGON_COORDS_KEY],
+         polygon_dict[NEGATIVE_POLYGON_OFFSETS_KEY]
+        ) = _read_polygons_one_sign(
+            dataset_object=dataset_object, positive=False)
+
+    if POSITIVE_MASK_MATRIX_KEY not in polygon_dict:
+        polygon_dict[POSITIVE_MASK_MATRIX_KEY] = polygons_to_mask(
+            polygon_objects_grid_coords=
+            polygon_dict[POSITIVE_POLYGON_OBJECTS_KEY],
+            num_grid_rows=mask_dimensions[2],
+            num_grid_columns=mask_dimensions[3],
+            num_panel_rows=mask_dimensions[0],
+            num_panel_columns=mask_dimensions[1],
+            panel_row_by_polygon=polygon_dict[POSITIVE_PANEL_ROW_BY_POLY_KEY],
+            panel_column_by_polygon=
+            polygon_dict[POSITIVE_PANEL_COLUMN_BY_POLY_KEY]
         )
 
-        positive_panel_column_by_polygon = positive_panel_column_by_vertex[
-            these_poly_to_first_vertex_indices]
-
-    polygon_dict[POSITIVE_PANEL_ROW_BY_POLY_KEY] = positive_panel_row_by_polygon
-    polygon_dict[
-        POSITIVE_PANEL_COLUMN_BY_POLY_KEY] = positive_panel_column_by_polygon
-
-    (negative_objects_grid_coords, these_poly_to_first_vertex_indices
-    ) = _vertex_list_to_polygon_list(
-        vertex_rows=numpy.array(
-            dataset_object.variables[NEGATIVE_VERTEX_ROWS_KEY][:], dtype=float
-        ),
-        vertex_columns=numpy.array(
-            dataset_object.variables[NEGATIVE_VERTEX_COLUMNS_KEY][:],
-            dtype=float
+        polygon_dict[NEGATIVE_MASK_MATRIX_KEY] = polygons_to_mask(
+            polygon_objects_grid_coords=
+            polygon_dict[NEGATIVE_POLYGON_OBJECTS_KEY],
+            num_grid_rows=mask_dimensions[2],
+            num_grid_columns=mask_dimensions[3],
+            num_panel_rows=mask_dimensions[0],
+            num_panel_columns=mask_dimensions[1],
+            panel_row_by_polygon=polygon_dict[NEGATIVE_PANEL_ROW_BY_POLY_KEY],
+            panel_column_by_polygon=
+            polygon_dict[NEGATIVE_PANEL_COLUMN_BY_POLY_KEY]
         )
-    )
-
-    negative_panel_row_by_vertex = numpy.array(
-        dataset_object.variables[NEGATIVE_PANEL_ROW_BY_VERTEX_KEY][:], dtype=int
-    )
-
-    negative_panel_row_by_polygon = negative_panel_row_by_vertex[
-        these_poly_to_first_vertex_indices]
 
-    negative_panel_column_by_vertex = numpy.array(
-        dataset_object.variables[NEGATIVE_PANEL_COLUMN_BY_VERTEX_KEY][:],
-        dtype=int
-    )
-
-    negative_panel_column_by_polygon = negative_panel_column_by_vertex[
-        these_poly_to_first_vertex_indices]
-
-    polygon_dict[NEGATIVE_PANEL_ROW_BY_POLY_KEY] = negative_panel_row_by_polygon
-    polygon_dict[
-        NEGATIVE_PANEL_COLUMN_BY_POLY_KEY] = negative_panel_column_by_polygon
+    if use_cache:
+        try:
+            _write_polygon_cache(
+                cache_file_name=cache_file_name, polygon_dict=polygon_dict,
+                netcdf_file_stats=netcdf_file_stats)
+        except OSError as this_error:
+            warning_string = (
+                'Could not write cache file "{0:s}" ({1:s}).  Returning '
+                'polygons read from NetCDF file.'
+            ).format(cache_file_name, str(this_error))
 
-    dataset_object.close()
+            warnings.warn(warning_string)
 
-    polygon_dict[POSITIVE_POLYGON_OBJECTS_KEY] = positive_objects_grid_coords
-    polygon_dict[NEGATIVE_POLYGON_OBJECTS_KEY] = negative_objects_grid_coords
     return polygon_dict
 
 
@@ -1141,28 +2147,26 @@ def read_points(netcdf_file_name):
     """
 
     error_checking.assert_file_exists(netcdf_file_name)
-    dataset_object = netCDF4.Dataset(netcdf_file_name)
-
-    point_dict = {
-        STORM_ID_KEY: str(getattr(dataset_object, STORM_ID_KEY)),
-        STORM_TIME_KEY: int(numpy.round(
-            getattr(dataset_object, STORM_TIME_KEY)
-        )),
-        GRID_ROW_BY_POINT_KEY: numpy.array(
-            dataset_object.variables[GRID_ROW_BY_POINT_KEY][:], dtype=float
-        ),
-        GRID_COLUMN_BY_POINT_KEY: numpy.array(
-            dataset_object.variables[GRID_COLUMN_BY_POINT_KEY][:], dtype=float
-        ),
-        PANEL_ROW_BY_POINT_KEY: numpy.array(
-            dataset_object.variables[PANEL_ROW_BY_POINT_KEY][:], dtype=int
-        ),
-        PANEL_COLUMN_BY_POINT_KEY: numpy.array(
-            dataset_object.variables[PANEL_COLUMN_BY_POINT_KEY][:], dtype=int
-        )
-    }
 
-    dataset_object.close()
+    with netCDF4.Dataset(netcdf_file_name) as dataset_object:
+        point_dict = {
+            STORM_ID_KEY: str(getattr(dataset_object, STORM_ID_KEY)),
+            STORM_TIME_KEY: int(numpy.round(
+                getattr(dataset_object, STORM_TIME_KEY)
+            )),
+            GRID_ROW_BY_POINT_KEY: _read_netcdf_variable(
+                dataset_object=dataset_object,
+                variable_name=GRID_ROW_BY_POINT_KEY, dtype=float),
+            GRID_COLUMN_BY_POINT_KEY: _read_netcdf_variable(
+                dataset_object=dataset_object,
+                variable_name=GRID_COLUMN_BY_POINT_KEY, dtype=float),
+            PANEL_ROW_BY_POINT_KEY: _read_netcdf_variable(
+                dataset_object=dataset_object,
+                variable_name=PANEL_ROW_BY_POINT_KEY, dtype=int),
+            PANEL_COLUMN_BY_POINT_KEY: _read_netcdf_variable(
+                dataset_object=dataset_object,
+                variable_name=PANEL_COLUMN_BY_POINT_KEY, dtype=int)
+        }
 
     if point_dict[STORM_ID_KEY] == DUMMY_STORM_ID_STRING:
         point_dict[STORM_ID_KEY] = None
@@ -1,14 +1,19 @@
 """Unit tests for human_polygons.py."""
 
+import os.path
+import tempfile
 import unittest
+from unittest import mock
 import numpy
+import netCDF4
+from PIL import Image
 from stormlabeler.utils import polygons
 from stormlabeler.utils import human_polygons
 
 TOLERANCE = 1e-6
 TOLERANCE_NUM_DECIMAL_PLACES = 6
 
-# The following constants are used to test _vertex_list_to_polygon_list and
+# The following constants are used to test _find_polygon_starts and
 # _polygon_list_to_vertex_list.
 TOY_VERTEX_ROWS = numpy.array([
     0, 5, 5, 0, 0, numpy.nan, 0, 0, 10, 10, 0, numpy.nan, -10, 20, 20, -10, -10
@@ -43,6 +48,31 @@ TOY_VERTEX_TO_POLY_INDICES = numpy.array(
 
 TOY_POLY_TO_FIRST_VERTEX_INDICES = numpy.array([0, 6, 12], dtype=int)
 
+# The following constants are used to test _polygons_to_vertex_arrays and
+# _vertex_arrays_to_polygons.
+THESE_REAL_FLAGS = numpy.invert(numpy.isnan(TOY_VERTEX_ROWS))
+TOY_VERTEX_X_COORDS = TOY_VERTEX_COLUMNS[THESE_REAL_FLAGS]
+TOY_VERTEX_Y_COORDS = TOY_VERTEX_ROWS[THESE_REAL_FLAGS]
+TOY_FIRST_VERTEX_INDICES_NO_NAN = numpy.array([0, 5, 10], dtype=int)
+
+# The following constants are used to test read_image.
+NUM_IMAGE_ROWS = 8
+NUM_IMAGE_COLUMNS = 6
+IMAGE_PALETTE_COLOURS = numpy.array(
+    [[255, 0, 0], [0, 0, 255]], dtype=numpy.uint8
+)
+IMAGE_PALETTE_INDEX_MATRIX = numpy.zeros(
+    (NUM_IMAGE_ROWS, NUM_IMAGE_COLUMNS), dtype=numpy.uint8
+)
+IMAGE_PALETTE_INDEX_MATRIX[:, 3:] = 1
+
+IMAGE_GREY_MATRIX = numpy.full(
+    (NUM_IMAGE_ROWS, NUM_IMAGE_COLUMNS), 100, dtype=numpy.uint8
+)
+IMAGE_ALPHA_MATRIX = numpy.full(
+    (NUM_IMAGE_ROWS, NUM_IMAGE_COLUMNS), 200, dtype=numpy.uint8
+)
+
 # The following constants are used to test pixel_rows_to_grid_rows,
 # pixel_columns_to_grid_columns, and polygons_from_pixel_to_grid_coords.
 NUM_GRID_ROWS = 24
@@ -175,28 +205,224 @@ MASK_MATRIX[0, 1, ROWS_IN_LAST_4POLYGONS, COLUMNS_IN_LAST_4POLYGONS] = True
 MASK_MATRIX[1, 0, ROWS_IN_LAST_4POLYGONS, COLUMNS_IN_LAST_4POLYGONS] = True
 MASK_MATRIX[2, 1, ROWS_IN_LAST_4POLYGONS, COLUMNS_IN_LAST_4POLYGONS] = True
 
+# The following constants are used to test write_polygons and read_polygons.
+STORM_ID_STRING_FOR_CACHE = '000001_20110520'
+STORM_TIME_UNIX_SEC_FOR_CACHE = 1305900000
+
+# The following constants are used to test _pack_masks and _unpack_masks.
+POSITIVE_MASK_MATRIX_TO_PACK = numpy.array([
+    [0, 1, 0, 1],
+    [1, 1, 0, 0]
+], dtype=bool)
+
+NEGATIVE_MASK_MATRIX_TO_PACK = numpy.array([
+    [0, 0, 1, 1],
+    [0, 1, 1, 0]
+], dtype=bool)
+
+PACKED_MASK_MATRIX = numpy.array([
+    [0, 1, 2, 3],
+    [1, 3, 2, 0]
+], dtype=numpy.uint8)
+
+# The following constants are used to test _rasterize_polygons.
+FIRST_POLYGON_MASK_MATRIX = numpy.full(
+    (NUM_GRID_ROWS, NUM_GRID_COLUMNS), False, dtype=bool
+)
+FIRST_POLYGON_MASK_MATRIX[
+    ROWS_IN_FIRST_4POLYGONS, COLUMNS_IN_FIRST_4POLYGONS] = True
+
+SQUARE_VERTEX_ROWS = numpy.array([1, 1, 3, 3, 1], dtype=float)
+SQUARE_VERTEX_COLUMNS = numpy.array([1, 3, 3, 1, 1], dtype=float)
+SQUARE_MASK_MATRIX = numpy.full((5, 5), False, dtype=bool)
+SQUARE_MASK_MATRIX[1:4, 1:4] = True
+
+TWO_SQUARES_VERTEX_ROWS = numpy.array(
+    [1, 1, 3, 3, 1, 2, 2, 4, 4, 2], dtype=float
+)
+TWO_SQUARES_VERTEX_COLUMNS = numpy.array(
+    [1, 3, 3, 1, 1, 2, 4, 4, 2, 2], dtype=float
+)
+TWO_SQUARES_FIRST_VERTEX_INDICES = numpy.array([0, 5], dtype=int)
+TWO_SQUARES_MASK_MATRIX = numpy.full((6, 6), False, dtype=bool)
+TWO_SQUARES_MASK_MATRIX[1:4, 1:4] = True
+TWO_SQUARES_MASK_MATRIX[2:5, 2:5] = True
+
+
+def _write_toy_polygon_file(netcdf_file_name, include_negative,
+                            store_masks=True):
+    """Writes toy polygons to NetCDF file, for testing read_polygons.
+
+    :param netcdf_file_name: Path to output file.
+    :param include_negative: Boolean flag.  If True, the toy polygons will be
+        written as both positive and negative.  If False, only as positive.
+    :param store_masks: See doc for `human_polygons.write_polygons`.
+    """
+
+    if include_negative:
+        these_negative_objects = POLYGON_OBJECTS_GRID_COORDS
+        these_negative_panel_rows = PANEL_ROW_BY_POLYGON
+        these_negative_panel_columns = PANEL_COLUMN_BY_POLYGON
+        this_negative_mask_matrix = MASK_MATRIX
+    else:
+        these_negative_objects = None
+        these_negative_panel_rows = None
+        these_negative_panel_columns = None
+        this_negative_mask_matrix = None
+
+    human_polygons.write_polygons(
+        output_file_name=netcdf_file_name,
+        positive_objects_grid_coords=POLYGON_OBJECTS_GRID_COORDS,
+        positive_panel_row_by_polygon=PANEL_ROW_BY_POLYGON,
+        positive_panel_column_by_polygon=PANEL_COLUMN_BY_POLYGON,
+        positive_mask_matrix=MASK_MATRIX,
+        negative_objects_grid_coords=these_negative_objects,
+        negative_panel_row_by_polygon=these_negative_panel_rows,
+        negative_panel_column_by_polygon=these_negative_panel_columns,
+        negative_mask_matrix=this_negative_mask_matrix,
+        full_storm_id_string=STORM_ID_STRING_FOR_CACHE,
+        storm_time_unix_sec=STORM_TIME_UNIX_SEC_FOR_CACHE,
+        store_masks=store_masks)
+
+
+def _write_old_format_file(netcdf_file_name, include_negative):
+    """Writes toy polygons to NetCDF file in the older format.
+
+    The older format, written before vertex coordinates and masks were packed,
+    has one length-V variable for each of vertex row, vertex column, panel row
+    and panel column, and one int32 variable for each mask.
+
+    :param netcdf_file_name: Path to output file.
+    :param include_negative: See doc for `_write_toy_polygon_file`.
+    """
+
+    these_positive_rows, these_positive_columns, these_positive_indices = (
+        human_polygons._polygon_list_to_vertex_list(POLYGON_OBJECTS_GRID_COORDS)
+    )
+
+    if include_negative:
+        these_negative_rows = these_positive_rows
+        these_negative_columns = these_positive_columns
+        these_negative_indices = these_positive_indices
+        this_negative_mask_matrix = MASK_MATRIX
+    else:
+        these_negative_rows = numpy.array([], dtype=float)
+        these_negative_columns = numpy.array([], dtype=float)
+        these_negative_indices = numpy.array([], dtype=int)
+        this_negative_mask_matrix = numpy.full(
+            MASK_MATRIX.shape, False, dtype=bool)
+
+    dataset_object = netCDF4.Dataset(
+        netcdf_file_name, 'w', format='NETCDF3_64BIT_OFFSET')
+
+    dataset_object.setncattr(
+        human_polygons.STORM_ID_KEY, STORM_ID_STRING_FOR_CACHE)
+    dataset_object.setncattr(
+        human_polygons.STORM_TIME_KEY, STORM_TIME_UNIX_SEC_FOR_CACHE)
+
+    for this_dimension_key, this_length in zip(
+            [human_polygons.PANEL_ROW_DIMENSION_KEY,
+             human_polygons.PANEL_COLUMN_DIMENSION_KEY,
+             human_polygons.GRID_ROW_DIMENSION_KEY,
+             human_polygons.GRID_COLUMN_DIMENSION_KEY],
+            MASK_MATRIX.shape
+    ):
+        dataset_object.createDimension(this_dimension_key, this_length)
+
+    dataset_object.createDimension(
+        human_polygons.POSITIVE_VERTEX_DIM_KEY, len(these_positive_rows))
+    dataset_object.createDimension(
+        human_polygons.NEGATIVE_VERTEX_DIM_KEY, len(these_negative_rows))
+
+    these_mask_dimensions = (
+        human_polygons.PANEL_ROW_DIMENSION_KEY,
+        human_polygons.PANEL_COLUMN_DIMENSION_KEY,
+        human_polygons.GRID_ROW_DIMENSION_KEY,
+        human_polygons.GRID_COLUMN_DIMENSION_KEY
+    )
+
+    for (this_dimension_key, these_rows, these_columns, these_indices,
+         this_mask_matrix, these_variable_keys) in [
+             (human_polygons.POSITIVE_VERTEX_DIM_KEY, these_positive_rows,
+              these_positive_columns, these_positive_indices, MASK_MATRIX,
+              (human_polygons.POSITIVE_VERTEX_ROWS_KEY,
+               human_polygons.POSITIVE_VERTEX_COLUMNS_KEY,
+               human_polygons.POSITIVE_PANEL_ROW_BY_VERTEX_KEY,
+               human_polygons.POSITIVE_PANEL_COLUMN_BY_VERTEX_KEY,
+               human_polygons.POSITIVE_MASK_MATRIX_KEY)),
+             (human_polygons.NEGATIVE_VERTEX_DIM_KEY, these_negative_rows,
+              these_negative_columns, these_negative_indices,
+              this_negative_mask_matrix,
+              (human_polygons.NEGATIVE_VERTEX_ROWS_KEY,
+               human_polygons.NEGATIVE_VERTEX_COLUMNS_KEY,
+               human_polygons.NEGATIVE_PANEL_ROW_BY_VERTEX_KEY,
+               human_polygons.NEGATIVE_PANEL_COLUMN_BY_VERTEX_KEY,
+               human_polygons.NEGATIVE_MASK_MATRIX_KEY))
+    ]:
+        these_real_flags = these_indices >= 0
+        these_panel_rows = numpy.full(len(these_indices), -1, dtype=int)
+        these_panel_rows[these_real_flags] = (
+            PANEL_ROW_BY_POLYGON[these_indices[these_real_flags]]
+        )
+        these_panel_columns = numpy.full(len(these_indices), -1, dtype=int)
+        these_panel_columns[these_real_flags] = (
+            PANEL_COLUMN_BY_POLYGON[these_indices[these_real_flags]]
+        )
+
+        for this_variable_key, these_values, this_datatype in zip(
+                these_variable_keys[:4],
+                [these_rows, these_columns, these_panel_rows,
+                 these_panel_columns],
+                [numpy.float32, numpy.float32, numpy.int32, numpy.int32]
+        ):
+            dataset_object.createVariable(
+                this_variable_key, datatype=this_datatype,
+                dimensions=this_dimension_key)
+
+            if len(these_values) > 0:
+                dataset_object.variables[this_variable_key][:] = these_values
+
+        dataset_object.createVariable(
+            these_variable_keys[4], datatype=numpy.int32,
+            dimensions=these_mask_dimensions)
+        dataset_object.variables[these_variable_keys[4]][:] = (
+            this_mask_matrix.astype(int)
+        )
+
+    dataset_object.close()
+
 
 class HumanPolygonsTests(unittest.TestCase):
     """Each method is a unit test for human_polygons.py."""
 
-    def test_vertex_list_to_polygon_list(self):
-        """Ensures correct output from _vertex_list_to_polygon_list."""
+    def test_find_polygon_starts(self):
+        """Ensures correct output from _find_polygon_starts."""
 
-        these_polygon_objects, these_poly_to_first_vertex_indices = (
-            human_polygons._vertex_list_to_polygon_list(
+        these_first_vertex_indices, these_real_flags = (
+            human_polygons._find_polygon_starts(
                 vertex_rows=TOY_VERTEX_ROWS, vertex_columns=TOY_VERTEX_COLUMNS)
         )
 
         self.assertTrue(numpy.array_equal(
-            these_poly_to_first_vertex_indices, TOY_POLY_TO_FIRST_VERTEX_INDICES
+            these_first_vertex_indices, TOY_POLY_TO_FIRST_VERTEX_INDICES
+        ))
+        self.assertTrue(numpy.array_equal(
+            these_real_flags, TOY_VERTEX_TO_POLY_INDICES >= 0
         ))
 
-        for k in range(len(these_polygon_objects)):
-            self.assertTrue(
-                these_polygon_objects[k].almost_equals(
-                    TOY_POLYGON_OBJECTS[k], decimal=TOLERANCE_NUM_DECIMAL_PLACES
-                )
-            )
+    def test_find_polygon_starts_mismatch(self):
+        """Ensures that _find_polygon_starts raises error.
+
+        In this case, row and column lists have NaN's at different locations.
+        """
+
+        these_vertex_columns = TOY_VERTEX_COLUMNS + 0.
+        these_vertex_columns[0] = numpy.nan
+
+        with self.assertRaises(ValueError):
+            human_polygons._find_polygon_starts(
+                vertex_rows=TOY_VERTEX_ROWS,
+                vertex_columns=these_vertex_columns)
 
     def test_polygon_list_to_vertex_list(self):
         """Ensures correct output from _polygon_list_to_vertex_list."""
@@ -217,6 +443,101 @@ class HumanPolygonsTests(unittest.TestCase):
             these_vertex_to_polygon_indices, TOY_VERTEX_TO_POLY_INDICES
         ))
 
+    def test_polygons_to_vertex_arrays(self):
+        """Ensures correct output from _polygons_to_vertex_arrays."""
+
+        (these_x_coords, these_y_coords, these_first_vertex_indices
+        ) = human_polygons._polygons_to_vertex_arrays(TOY_POLYGON_OBJECTS)
+
+        self.assertTrue(numpy.allclose(
+            these_x_coords, TOY_VERTEX_X_COORDS, atol=TOLERANCE
+        ))
+        self.assertTrue(numpy.allclose(
+            these_y_coords, TOY_VERTEX_Y_COORDS, atol=TOLERANCE
+        ))
+        self.assertTrue(numpy.array_equal(
+            these_first_vertex_indices, TOY_FIRST_VERTEX_INDICES_NO_NAN
+        ))
+
+    def test_vertex_arrays_to_polygons(self):
+        """Ensures correct output from _vertex_arrays_to_polygons."""
+
+        these_polygon_objects = human_polygons._vertex_arrays_to_polygons(
+            vertex_x_coords=TOY_VERTEX_X_COORDS,
+            vertex_y_coords=TOY_VERTEX_Y_COORDS,
+            polygon_to_first_vertex_indices=TOY_FIRST_VERTEX_INDICES_NO_NAN)
+
+        self.assertTrue(len(these_polygon_objects) == len(TOY_POLYGON_OBJECTS))
+
+        for k in range(len(these_polygon_objects)):
+            self.assertTrue(these_polygon_objects[k].equals_exact(
+                TOY_POLYGON_OBJECTS[k], TOLERANCE
+            ))
+
+    def test_vertex_arrays_to_polygons_empty(self):
+        """Ensures correct output from _vertex_arrays_to_polygons.
+
+        In this case there are no polygons.
+        """
+
+        these_polygon_objects = human_polygons._vertex_arrays_to_polygons(
+            vertex_x_coords=numpy.array([], dtype=float),
+            vertex_y_coords=numpy.array([], dtype=float),
+            polygon_to_first_vertex_indices=numpy.array([], dtype=int)
+        )
+
+        self.assertTrue(these_polygon_objects == [])
+
+    def test_read_image_palette(self):
+        """Ensures correct output from read_image.
+
+        In this case the image is stored with a colour palette.
+        """
+
+        this_image_object = Image.fromarray(IMAGE_PALETTE_INDEX_MATRIX, 'P')
+        this_image_object.putpalette(IMAGE_PALETTE_COLOURS.ravel().tolist())
+
+        with tempfile.TemporaryDirectory() as this_directory_name:
+            this_file_name = os.path.join(this_directory_name, 'palette.png')
+            this_image_object.save(this_file_name)
+            this_image_matrix = human_polygons.read_image(this_file_name)
+
+        self.assertTrue(this_image_matrix.shape == (
+            NUM_IMAGE_ROWS, NUM_IMAGE_COLUMNS, 4
+        ))
+        self.assertTrue(numpy.array_equal(
+            this_image_matrix[..., :3],
+            IMAGE_PALETTE_COLOURS[IMAGE_PALETTE_INDEX_MATRIX]
+        ))
+        self.assertTrue(numpy.all(this_image_matrix[..., 3] == 255))
+
+    def test_read_image_grey_alpha(self):
+        """Ensures correct output from read_image.
+
+        In this case the image is greyscale with an alpha channel.
+        """
+
+        this_image_object = Image.fromarray(
+            numpy.stack((IMAGE_GREY_MATRIX, IMAGE_ALPHA_MATRIX), axis=-1),
+            'LA'
+        )
+
+        with tempfile.TemporaryDirectory() as this_directory_name:
+            this_file_name = os.path.join(this_directory_name, 'grey.png')
+            this_image_object.save(this_file_name)
+            this_image_matrix = human_polygons.read_image(this_file_name)
+
+        self.assertTrue(this_image_matrix.shape == (
+            NUM_IMAGE_ROWS, NUM_IMAGE_COLUMNS, 4
+        ))
+        for k in range(3):
+            self.assertTrue(numpy.array_equal(
+                this_image_matrix[..., k], IMAGE_GREY_MATRIX
+            ))
+        self.assertTrue(numpy.array_equal(
+            this_image_matrix[..., 3], IMAGE_ALPHA_MATRIX
+        ))
+
     def test_pixel_rows_to_grid_rows_first(self):
         """Ensures correct output from pixel_rows_to_grid_rows.
 
@@ -340,6 +661,80 @@ class HumanPolygonsTests(unittest.TestCase):
                 )
             )
 
+    def test_pack_masks(self):
+        """Ensures correct output from _pack_masks."""
+
+        this_packed_mask_matrix = human_polygons._pack_masks(
+            positive_mask_matrix=POSITIVE_MASK_MATRIX_TO_PACK,
+            negative_mask_matrix=NEGATIVE_MASK_MATRIX_TO_PACK)
+
+        self.assertTrue(numpy.array_equal(
+            this_packed_mask_matrix, PACKED_MASK_MATRIX
+        ))
+
+    def test_unpack_masks(self):
+        """Ensures correct output from _unpack_masks."""
+
+        this_positive_mask_matrix, this_negative_mask_matrix = (
+            human_polygons._unpack_masks(PACKED_MASK_MATRIX)
+        )
+
+        self.assertTrue(numpy.array_equal(
+            this_positive_mask_matrix, POSITIVE_MASK_MATRIX_TO_PACK
+        ))
+        self.assertTrue(numpy.array_equal(
+            this_negative_mask_matrix, NEGATIVE_MASK_MATRIX_TO_PACK
+        ))
+
+    def test_rasterize_polygons_first(self):
+        """Ensures correct output from _rasterize_polygons.
+
+        In this case, testing first polygon.
+        """
+
+        this_mask_matrix = human_polygons._rasterize_polygons(
+            vertex_rows=FIRST_GRID_ROW_BY_VERTEX,
+            vertex_columns=FIRST_GRID_COLUMN_BY_VERTEX,
+            polygon_to_first_vertex_indices=numpy.array([0], dtype=int),
+            num_grid_rows=NUM_GRID_ROWS, num_grid_columns=NUM_GRID_COLUMNS)
+
+        self.assertTrue(numpy.array_equal(
+            this_mask_matrix, FIRST_POLYGON_MASK_MATRIX
+        ))
+
+    def test_rasterize_polygons_square(self):
+        """Ensures correct output from _rasterize_polygons.
+
+        In this case, testing square with grid points on every edge.
+        """
+
+        this_mask_matrix = human_polygons._rasterize_polygons(
+            vertex_rows=SQUARE_VERTEX_ROWS,
+            vertex_columns=SQUARE_VERTEX_COLUMNS,
+            polygon_to_first_vertex_indices=numpy.array([0], dtype=int),
+            num_grid_rows=SQUARE_MASK_MATRIX.shape[0],
+            num_grid_columns=SQUARE_MASK_MATRIX.shape[1])
+
+        self.assertTrue(numpy.array_equal(this_mask_matrix, SQUARE_MASK_MATRIX))
+
+    def test_rasterize_polygons_two_squares(self):
+        """Ensures correct output from _rasterize_polygons.
+
+        In this case, testing two overlapping squares, where the overlap should
+        be filled.
+        """
+
+        this_mask_matrix = human_polygons._rasterize_polygons(
+            vertex_rows=TWO_SQUARES_VERTEX_ROWS,
+            vertex_columns=TWO_SQUARES_VERTEX_COLUMNS,
+            polygon_to_first_vertex_indices=TWO_SQUARES_FIRST_VERTEX_INDICES,
+            num_grid_rows=TWO_SQUARES_MASK_MATRIX.shape[0],
+            num_grid_columns=TWO_SQUARES_MASK_MATRIX.shape[1])
+
+        self.assertTrue(numpy.array_equal(
+            this_mask_matrix, TWO_SQUARES_MASK_MATRIX
+        ))
+
     def test_polygons_to_mask(self):
         """Ensures correct output from polygons_to_mask."""
 
@@ -352,6 +747,480 @@ class HumanPolygonsTests(unittest.TestCase):
 
         self.assertTrue(numpy.array_equal(this_mask_matrix, MASK_MATRIX))
 
+    def test_polygons_to_mask_iter(self):
+        """Ensures correct output from polygons_to_mask_iter."""
+
+        these_panel_indices = []
+
+        for this_panel_row, this_panel_column, this_mask_matrix in (
+                human_polygons.polygons_to_mask_iter(
+                    polygon_objects_grid_coords=POLYGON_OBJECTS_GRID_COORDS,
+                    num_grid_rows=NUM_GRID_ROWS,
+                    num_grid_columns=NUM_GRID_COLUMNS,
+                    num_panel_rows=NUM_PANEL_ROWS,
+                    num_panel_columns=NUM_PANEL_COLUMNS,
+                    panel_row_by_polygon=PANEL_ROW_BY_POLYGON,
+                    panel_column_by_polygon=PANEL_COLUMN_BY_POLYGON)
+        ):
+            these_panel_indices.append((this_panel_row, this_panel_column))
+
+            self.assertTrue(numpy.array_equal(
+                this_mask_matrix,
+                MASK_MATRIX[this_panel_row, this_panel_column, ...]
+            ))
+
+        these_expected_indices = [
+            (j, k) for j in range(NUM_PANEL_ROWS)
+            for k in range(NUM_PANEL_COLUMNS)
+        ]
+        self.assertTrue(these_panel_indices == these_expected_indices)
+
+    def test_polygons_to_mask_iter_modified(self):
+        """Ensures correct output from polygons_to_mask_iter.
+
+        In this case each yielded mask is modified in place, which must not
+        change the masks yielded for later panels with the same polygons.
+        """
+
+        for this_panel_row, this_panel_column, this_mask_matrix in (
+                human_polygons.polygons_to_mask_iter(
+                    polygon_objects_grid_coords=POLYGON_OBJECTS_GRID_COORDS,
+                    num_grid_rows=NUM_GRID_ROWS,
+                    num_grid_columns=NUM_GRID_COLUMNS,
+                    num_panel_rows=NUM_PANEL_ROWS,
+                    num_panel_columns=NUM_PANEL_COLUMNS,
+                    panel_row_by_polygon=PANEL_ROW_BY_POLYGON,
+                    panel_column_by_polygon=PANEL_COLUMN_BY_POLYGON)
+        ):
+            self.assertTrue(numpy.array_equal(
+                this_mask_matrix,
+                MASK_MATRIX[this_panel_row, this_panel_column, ...]
+            ))
+
+            this_mask_matrix[:] = numpy.invert(this_mask_matrix)
+
+    def test_read_polygons_no_stored_masks(self):
+        """Ensures correct output from read_polygons.
+
+        In this case the file is written without masks, so read_polygons must
+        recompute both masks from the polygons.  The masks must be the same as
+        those read from a file written with masks.
+        """
+
+        with tempfile.TemporaryDirectory() as this_directory_name:
+            this_file_name_with_masks = os.path.join(
+                this_directory_name, 'with_masks.nc')
+            this_file_name_no_masks = os.path.join(
+                this_directory_name, 'no_masks.nc')
+
+            _write_toy_polygon_file(
+                netcdf_file_name=this_file_name_with_masks,
+                include_negative=True, store_masks=True)
+            _write_toy_polygon_file(
+                netcdf_file_name=this_file_name_no_masks,
+                include_negative=True, store_masks=False)
+
+            this_dict_with_masks = human_polygons.read_polygons(
+                this_file_name_with_masks)
+            this_dict_no_masks = human_polygons.read_polygons(
+                this_file_name_no_masks)
+
+        for this_key in [human_polygons.POSITIVE_MASK_MATRIX_KEY,
+                         human_polygons.NEGATIVE_MASK_MATRIX_KEY]:
+            self.assertTrue(numpy.array_equal(
+                this_dict_no_masks[this_key], this_dict_with_masks[this_key]
+            ))
+            self.assertTrue(numpy.array_equal(
+                this_dict_no_masks[this_key], MASK_MATRIX
+            ))
+
+    def test_read_polygons_no_stored_masks_no_negative(self):
+        """Ensures correct output from read_polygons.
+
+        In this case the file is written without masks or negative polygons.
+        The negative mask must be all False, with the panel and grid
+        dimensions stored in the file.
+        """
+
+        with tempfile.TemporaryDirectory() as this_directory_name:
+            this_file_name_with_masks = os.path.join(
+                this_directory_name, 'with_masks.nc')
+            this_file_name_no_masks = os.path.join(
+                this_directory_name, 'no_masks.nc')
+
+            _write_toy_polygon_file(
+                netcdf_file_name=this_file_name_with_masks,
+                include_negative=False, store_masks=True)
+            _write_toy_polygon_file(
+                netcdf_file_name=this_file_name_no_masks,
+                include_negative=False, store_masks=False)
+
+            this_dict_with_masks = human_polygons.read_polygons(
+                this_file_name_with_masks)
+            this_dict_no_masks = human_polygons.read_polygons(
+                this_file_name_no_masks)
+
+        for this_key in [human_polygons.POSITIVE_MASK_MATRIX_KEY,
+                         human_polygons.NEGATIVE_MASK_MATRIX_KEY]:
+            self.assertTrue(numpy.array_equal(
+                this_dict_no_masks[this_key], this_dict_with_masks[this_key]
+            ))
+
+        self.assertTrue(numpy.array_equal(
+            this_dict_no_masks[human_polygons.POSITIVE_MASK_MATRIX_KEY],
+            MASK_MATRIX
+        ))
+
+        this_negative_mask_matrix = (
+            this_dict_no_masks[human_polygons.NEGATIVE_MASK_MATRIX_KEY]
+        )
+        self.assertTrue(this_negative_mask_matrix.shape == MASK_MATRIX.shape)
+        self.assertFalse(this_negative_mask_matrix.any())
+
+    def _compare_polygon_dicts(self, first_polygon_dict, second_polygon_dict):
+        """Ensures that two dictionaries from read_polygons are equivalent.
+
+        :param first_polygon_dict: First dictionary.
+        :param second_polygon_dict: Second dictionary.
+        """
+
+        for this_key in [
+                human_polygons.STORM_ID_KEY, human_polygons.STORM_TIME_KEY
+        ]:
+            self.assertTrue(
+                first_polygon_dict[this_key] == second_polygon_dict[this_key]
+            )
+
+        for this_key in [
+                human_polygons.POSITIVE_PANEL_ROW_BY_POLY_KEY,
+                human_polygons.POSITIVE_PANEL_COLUMN_BY_POLY_KEY,
+                human_polygons.POSITIVE_MASK_MATRIX_KEY,
+                human_polygons.NEGATIVE_PANEL_ROW_BY_POLY_KEY,
+                human_polygons.NEGATIVE_PANEL_COLUMN_BY_POLY_KEY,
+                human_polygons.NEGATIVE_MASK_MATRIX_KEY
+        ]:
+            self.assertTrue(numpy.array_equal(
+                first_polygon_dict[this_key], second_polygon_dict[this_key]
+            ))
+
+        for this_key in [
+                human_polygons.POSITIVE_POLYGON_OBJECTS_KEY,
+                human_polygons.NEGATIVE_POLYGON_OBJECTS_KEY
+        ]:
+            self.assertTrue(
+                len(first_polygon_dict[this_key]) ==
+                len(second_polygon_dict[this_key])
+            )
+
+            for this_first_object, this_second_object in zip(
+                    first_polygon_dict[this_key], second_polygon_dict[this_key]
+            ):
+                self.assertTrue(numpy.allclose(
+                    numpy.array(this_first_object.exterior.coords),
+                    numpy.array(this_second_object.exterior.coords),
+                    atol=TOLERANCE
+                ))
+
+    def test_read_polygons_old_format(self):
+        """Ensures correct output from read_polygons.
+
+        In this case the file is in the older format, with separate variables
+        for vertex rows and columns.  The output must be the same as for the
+        newer format.
+        """
+
+        with tempfile.TemporaryDirectory() as this_directory_name:
+            this_old_file_name = os.path.join(this_directory_name, 'old.nc')
+            this_new_file_name = os.path.join(this_directory_name, 'new.nc')
+
+            _write_old_format_file(
+                netcdf_file_name=this_old_file_name, include_negative=True)
+            _write_toy_polygon_file(
+                netcdf_file_name=this_new_file_name, include_negative=True)
+
+            this_old_polygon_dict = human_polygons.read_polygons(
+                this_old_file_name)
+            this_new_polygon_dict = human_polygons.read_polygons(
+                this_new_file_name)
+
+        self._compare_polygon_dicts(
+            this_old_polygon_dict, this_new_polygon_dict)
+
+        self.assertTrue(numpy.array_equal(
+            this_old_polygon_dict[
+                human_polygons.POSITIVE_PANEL_ROW_BY_POLY_KEY
+            ],
+            PANEL_ROW_BY_POLYGON
+        ))
+        self.assertTrue(numpy.array_equal(
+            this_old_polygon_dict[human_polygons.POSITIVE_MASK_MATRIX_KEY],
+            MASK_MATRIX
+        ))
+
+    def test_read_polygons_old_format_no_negative(self):
+        """Ensures correct output from read_polygons.
+
+        In this case the file is in the older format and has no negative
+        polygons.
+        """
+
+        with tempfile.TemporaryDirectory() as this_directory_name:
+            this_old_file_name = os.path.join(this_directory_name, 'old.nc')
+            this_new_file_name = os.path.join(this_directory_name, 'new.nc')
+
+            _write_old_format_file(
+                netcdf_file_name=this_old_file_name, include_negative=False)
+            _write_toy_polygon_file(
+                netcdf_file_name=this_new_file_name, include_negative=False)
+
+            this_old_polygon_dict = human_polygons.read_polygons(
+                this_old_file_name)
+            this_new_polygon_dict = human_polygons.read_polygons(
+                this_new_file_name)
+
+        self._compare_polygon_dicts(
+            this_old_polygon_dict, this_new_polygon_dict)
+        self.assertTrue(
+            len(this_old_polygon_dict[
+                human_polygons.NEGATIVE_POLYGON_OBJECTS_KEY
+            ]) == 0
+        )
+
+    def test_read_netcdf_variable_indexed(self):
+        """Ensures correct output from _read_netcdf_variable.
+
+        In this case elements are read by index, which must give the same
+        values as reading the whole variable and then taking the elements.
+        """
+
+        with tempfile.TemporaryDirectory() as this_directory_name:
+            this_file_name = os.path.join(this_directory_name, 'polygons.nc')
+            _write_toy_polygon_file(
+                netcdf_file_name=this_file_name, include_negative=True)
+
+            with netCDF4.Dataset(this_file_name) as this_dataset_object:
+                these_all_values = human_polygons._read_netcdf_variable(
+                    dataset_object=this_dataset_object,
+                    variable_name=
+                    human_polygons.POSITIVE_PANEL_ROW_BY_VERTEX_KEY,
+                    dtype=int)
+
+                these_indices = numpy.linspace(
+                    0, len(these_all_values) - 1, num=4, dtype=int)
+
+                # With a threshold of 0, every indexed read goes through
+                # netCDF4 indexing.
+                with mock.patch.object(
+                        human_polygons, 'MIN_VALUES_PER_INDEXED_READ', 0
+                ):
+                    these_indexed_values = (
+                        human_polygons._read_netcdf_variable(
+                            dataset_object=this_dataset_object,
+                            variable_name=
+                            human_polygons.POSITIVE_PANEL_ROW_BY_VERTEX_KEY,
+                            dtype=int, indices=these_indices)
+                    )
+
+                these_taken_values = human_polygons._read_netcdf_variable(
+                    dataset_object=this_dataset_object,
+                    variable_name=
+                    human_polygons.POSITIVE_PANEL_ROW_BY_VERTEX_KEY,
+                    dtype=int, indices=these_indices)
+
+        these_expected_values = numpy.take(these_all_values, these_indices)
+
+        self.assertTrue(numpy.array_equal(
+            these_indexed_values, these_expected_values
+        ))
+        self.assertTrue(numpy.array_equal(
+            these_taken_values, these_expected_values
+        ))
+        self.assertTrue(these_indexed_values.dtype == int)
+
+    def test_read_polygons_indexed(self):
+        """Ensures correct output from read_polygons.
+
+        In this case panel indices are read by index (with the threshold for
+        indexed reads lowered), which must give the same output as the default
+        path.
+        """
+
+        with tempfile.TemporaryDirectory() as this_directory_name:
+            this_file_name = os.path.join(this_directory_name, 'polygons.nc')
+            _write_toy_polygon_file(
+                netcdf_file_name=this_file_name, include_negative=True)
+
+            this_default_polygon_dict = human_polygons.read_polygons(
+                this_file_name)
+
+            with mock.patch.object(
+                    human_polygons, 'MIN_VALUES_PER_INDEXED_READ', 0
+            ):
+                this_indexed_polygon_dict = human_polygons.read_polygons(
+                    this_file_name)
+
+        self._compare_polygon_dicts(
+            this_indexed_polygon_dict, this_default_polygon_dict)
+
+    def test_read_polygons_cache(self):
+        """Ensures correct output from read_polygons with the cache.
+
+        The NetCDF file is rewritten with the same modification time, so the
+        cache must be invalidated by the change in file size.
+        """
+
+        with tempfile.TemporaryDirectory() as this_directory_name:
+            this_file_name = os.path.join(this_directory_name, 'polygons.nc')
+            this_cache_file_name = '{0:s}{1:s}'.format(
+                this_file_name, human_polygons.CACHE_FILE_SUFFIX)
+
+            _write_toy_polygon_file(
+                netcdf_file_name=this_file_name, include_negative=False)
+            this_file_stats = os.stat(this_file_name)
+
+            this_polygon_dict = human_polygons.read_polygons(
+                netcdf_file_name=this_file_name, use_cache=True)
+            self.assertTrue(os.path.isfile(this_cache_file_name))
+            self.assertFalse(
+                this_polygon_dict[human_polygons.NEGATIVE_MASK_MATRIX_KEY].any()
+            )
+
+            this_polygon_dict = human_polygons.read_polygons(
+                netcdf_file_name=this_file_name, use_cache=True)
+            self.assertTrue(
+                this_polygon_dict[human_polygons.STORM_ID_KEY] ==
+                STORM_ID_STRING_FOR_CACHE
+            )
+            self.assertTrue(
+                this_polygon_dict[human_polygons.STORM_TIME_KEY] ==
+                STORM_TIME_UNIX_SEC_FOR_CACHE
+            )
+            self.assertTrue(numpy.array_equal(
+                this_polygon_dict[human_polygons.POSITIVE_MASK_MATRIX_KEY],
+                MASK_MATRIX
+            ))
+            self.assertTrue(numpy.array_equal(
+                this_polygon_dict[
+                    human_polygons.POSITIVE_PANEL_ROW_BY_POLY_KEY
+                ],
+                PANEL_ROW_BY_POLYGON
+            ))
+            self.assertTrue(
+                len(this_polygon_dict[
+                    human_polygons.POSITIVE_POLYGON_OBJECTS_KEY
+                ]) == len(POLYGON_OBJECTS_GRID_COORDS)
+            )
+            self.assertFalse(
+                this_polygon_dict[human_polygons.NEGATIVE_MASK_MATRIX_KEY].any()
+            )
+
+            _write_toy_polygon_file(
+                netcdf_file_name=this_file_name, include_negative=True)
+            os.utime(this_file_name, ns=(
+                this_file_stats.st_atime_ns, this_file_stats.st_mtime_ns
+            ))
+
+            this_polygon_dict = human_polygons.read_polygons(
+                netcdf_file_name=this_file_name, use_cache=True)
+            self.assertTrue(numpy.array_equal(
+                this_polygon_dict[human_polygons.NEGATIVE_MASK_MATRIX_KEY],
+                MASK_MATRIX
+            ))
+
+            this_polygon_dict = human_polygons.read_polygons(
+                netcdf_file_name=this_file_name, use_cache=True)
+            self.assertTrue(numpy.array_equal(
+                this_polygon_dict[human_polygons.NEGATIVE_MASK_MATRIX_KEY],
+                MASK_MATRIX
+            ))
+
+    def test_read_polygons_unwritable_cache(self):
+        """Ensures correct output from read_polygons with the cache.
+
+        In this case the cache file cannot be written, so read_polygons must
+        warn and still return the polygons read from the NetCDF file.
+        """
+
+        with tempfile.TemporaryDirectory() as this_directory_name:
+            this_file_name = os.path.join(this_directory_name, 'polygons.nc')
+            this_cache_file_name = '{0:s}{1:s}'.format(
+                this_file_name, human_polygons.CACHE_FILE_SUFFIX)
+
+            _write_toy_polygon_file(
+                netcdf_file_name=this_file_name, include_negative=True)
+
+            with mock.patch.object(
+                    human_polygons.tempfile, 'mkstemp',
+                    side_effect=PermissionError('read-only directory')
+            ):
+                with self.assertWarns(UserWarning):
+                    this_polygon_dict = human_polygons.read_polygons(
+                        netcdf_file_name=this_file_name, use_cache=True)
+
+            self.assertTrue(numpy.array_equal(
+                this_polygon_dict[human_polygons.NEGATIVE_MASK_MATRIX_KEY],
+                MASK_MATRIX
+            ))
+            self.assertFalse(os.path.isfile(this_cache_file_name))
+
+    def test_read_polygons_cache_mode(self):
+        """Ensures that read_polygons writes cache file with normal mode."""
+
+        with tempfile.TemporaryDirectory() as this_directory_name:
+            this_file_name = os.path.join(this_directory_name, 'polygons.nc')
+            this_cache_file_name = '{0:s}{1:s}'.format(
+                this_file_name, human_polygons.CACHE_FILE_SUFFIX)
+
+            _write_toy_polygon_file(
+                netcdf_file_name=this_file_name, include_negative=False)
+            human_polygons.read_polygons(
+                netcdf_file_name=this_file_name, use_cache=True)
+
+            this_umask = os.umask(0)
+            os.umask(this_umask)
+
+            self.assertTrue(
+                os.stat(this_cache_file_name).st_mode & 0o777 ==
+                0o666 & ~this_umask
+            )
+            self.assertTrue(len(os.listdir(this_directory_name)) == 2)
+
+    def test_read_polygons_corrupt_cache(self):
+        """Ensures correct output from read_polygons with the cache.
+
+        In this case the cache file is truncated, so the NetCDF file must be
+        read instead and the cache rewritten.
+        """
+
+        with tempfile.TemporaryDirectory() as this_directory_name:
+            this_file_name = os.path.join(this_directory_name, 'polygons.nc')
+            this_cache_file_name = '{0:s}{1:s}'.format(
+                this_file_name, human_polygons.CACHE_FILE_SUFFIX)
+
+            _write_toy_polygon_file(
+                netcdf_file_name=this_file_name, include_negative=True)
+            human_polygons.read_polygons(
+                netcdf_file_name=this_file_name, use_cache=True)
+
+            with open(this_cache_file_name, 'rb') as this_file_handle:
+                these_cache_bytes = this_file_handle.read()
+            with open(this_cache_file_name, 'wb') as this_file_handle:
+                this_file_handle.write(
+                    these_cache_bytes[:(len(these_cache_bytes) // 2)]
+                )
+
+            with self.assertWarns(UserWarning):
+                this_polygon_dict = human_polygons.read_polygons(
+                    netcdf_file_name=this_file_name, use_cache=True)
+
+            self.assertTrue(numpy.array_equal(
+                this_polygon_dict[human_polygons.NEGATIVE_MASK_MATRIX_KEY],
+                MASK_MATRIX
+            ))
+            self.assertTrue(
+                os.path.getsize(this_cache_file_name) == len(these_cache_bytes)
+            )
+
 
 if __name__ == '__main__':
     unittest.main()
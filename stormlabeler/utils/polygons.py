@@ -118,6 +118,105 @@ def vertex_arrays_to_polygon(x_coordinates, y_coordinates):
     return polygon_object
 
 
+def points_in_or_on_polygon(
+        polygon_object, query_x_coordinates, query_y_coordinates):
+    """Finds query points inside or touching the polygon.
+
+    This is a branchless crossing-number (even-odd) test, vectorized over all
+    query points and all edges (of the exterior and holes) at once.  Points on
+    an edge are counted as inside, like `shapely.geometry.Polygon.touches`.
+
+    P = number of query points
+
+    :param polygon_object: `shapely.geometry.Polygon` object.
+    :param query_x_coordinates: length-P numpy array with x-coordinates of query
+        points.
+    :param query_y_coordinates: length-P numpy array with y-coordinates of query
+        points.
+    :return: result_flags: length-P numpy array of Boolean flags.  If
+        result_flags[k] = True, the [k]th query point is inside/touching the
+        polygon.
+    """
+
+    error_checking.assert_is_numpy_array_without_nan(query_x_coordinates)
+    error_checking.assert_is_numpy_array(query_x_coordinates, num_dimensions=1)
+
+    these_expected_dim = numpy.array([len(query_x_coordinates)], dtype=int)
+    error_checking.assert_is_numpy_array_without_nan(query_y_coordinates)
+    error_checking.assert_is_numpy_array(
+        query_y_coordinates, exact_dimensions=these_expected_dim)
+
+    # Shapely rings are closed, so edge k goes from vertex k to vertex k + 1.
+    ring_coord_matrices = [
+        numpy.array(r.coords)
+        for r in [polygon_object.exterior] + list(polygon_object.interiors)
+    ]
+
+    first_vertex_matrix = numpy.concatenate(
+        [m[:-1, :] for m in ring_coord_matrices], axis=0
+    )
+    second_vertex_matrix = numpy.concatenate(
+        [m[1:, :] for m in ring_coord_matrices], axis=0
+    )
+
+    first_x_by_edge = first_vertex_matrix[:, 0]
+    first_y_by_edge = first_vertex_matrix[:, 1]
+    second_x_by_edge = second_vertex_matrix[:, 0]
+    second_y_by_edge = second_vertex_matrix[:, 1]
+
+    # Query points go along the first axis, edges along the second.
+    query_x_matrix = query_x_coordinates[:, numpy.newaxis]
+    query_y_matrix = query_y_coordinates[:, numpy.newaxis]
+
+    crossing_flag_matrix = numpy.logical_xor(
+        first_y_by_edge > query_y_matrix, second_y_by_edge > query_y_matrix
+    )
+
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        crossing_x_matrix = first_x_by_edge + (
+            (query_y_matrix - first_y_by_edge) *
+            (second_x_by_edge - first_x_by_edge) /
+            (second_y_by_edge - first_y_by_edge)
+        )
+
+    num_crossings_by_point = numpy.sum(
+        numpy.logical_and(
+            crossing_flag_matrix, query_x_matrix < crossing_x_matrix
+        ),
+        axis=1
+    )
+
+    cross_product_matrix = (
+        (second_x_by_edge - first_x_by_edge) *
+        (query_y_matrix - first_y_by_edge) -
+        (second_y_by_edge - first_y_by_edge) *
+        (query_x_matrix - first_x_by_edge)
+    )
+
+    on_edge_flag_matrix = numpy.logical_and(
+        numpy.isclose(cross_product_matrix, 0.),
+        numpy.logical_and(
+            numpy.logical_and(
+                query_x_matrix >= numpy.minimum(
+                    first_x_by_edge, second_x_by_edge),
+                query_x_matrix <= numpy.maximum(
+                    first_x_by_edge, second_x_by_edge)
+            ),
+            numpy.logical_and(
+                query_y_matrix >= numpy.minimum(
+                    first_y_by_edge, second_y_by_edge),
+                query_y_matrix <= numpy.maximum(
+                    first_y_by_edge, second_y_by_edge)
+            )
+        )
+    )
+
+    return numpy.logical_or(
+        numpy.mod(num_crossings_by_point, 2) == 1,
+        numpy.any(on_edge_flag_matrix, axis=1)
+    )
+
+
 def point_in_or_on_polygon(
         polygon_object, query_x_coordinate, query_y_coordinate):
     """Returns True if point is inside/touching the polygon, False otherwise.
@@ -132,10 +231,8 @@ def point_in_or_on_polygon(
     error_checking.assert_is_not_nan(query_x_coordinate)
     error_checking.assert_is_not_nan(query_y_coordinate)
 
-    point_object = shapely.geometry.Point(
-        query_x_coordinate, query_y_coordinate)
-
-    if polygon_object.contains(point_object):
-        return True
-
-    return polygon_object.touches(point_object)
+    return bool(points_in_or_on_polygon(
+        polygon_object=polygon_object,
+        query_x_coordinates=numpy.array([query_x_coordinate], dtype=float),
+        query_y_coordinates=numpy.array([query_y_coordinate], dtype=float)
+    )[0])
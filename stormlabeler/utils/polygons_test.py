@@ -34,7 +34,8 @@ POLYGON_OBJECT_COMPLEX = shapely.geometry.Polygon(
     shell=COORD_LIST_SIMPLE, holes=tuple([COORD_LIST_HOLE])
 )
 
-# The following constants are used to test point_in_or_on_polygon.
+# The following constants are used to test point_in_or_on_polygon and
+# points_in_or_on_polygon.
 QUERY_X_COORDS = numpy.array(
     [0, 10, 20, 30, 40, 50, 60, 0, 10, 20, 40, 50, 60], dtype=float
 )
@@ -155,6 +156,36 @@ class PolygonsTests(unittest.TestCase):
             these_flags, IN_ON_POLYGON_FLAGS_COMPLEX
         ))
 
+    def test_points_in_or_on_polygon_simple(self):
+        """Ensures correct output from points_in_or_on_polygon.
+
+        In this case, using simple polygon.
+        """
+
+        these_flags = polygons.points_in_or_on_polygon(
+            polygon_object=POLYGON_OBJECT_SIMPLE,
+            query_x_coordinates=QUERY_X_COORDS,
+            query_y_coordinates=QUERY_Y_COORDS)
+
+        self.assertTrue(numpy.array_equal(
+            these_flags, IN_ON_POLYGON_FLAGS_SIMPLE
+        ))
+
+    def test_points_in_or_on_polygon_complex(self):
+        """Ensures correct output from points_in_or_on_polygon.
+
+        In this case, using complex polygon.
+        """
+
+        these_flags = polygons.points_in_or_on_polygon(
+            polygon_object=POLYGON_OBJECT_COMPLEX,
+            query_x_coordinates=QUERY_X_COORDS,
+            query_y_coordinates=QUERY_Y_COORDS)
+
+        self.assertTrue(numpy.array_equal(
+            these_flags, IN_ON_POLYGON_FLAGS_COMPLEX
+        ))
+
 
 if __name__ == '__main__':
     unittest.main()